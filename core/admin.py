@@ -2,8 +2,17 @@ from django.contrib import admin
 from .models import StockPrediction, SentimentAnalysis, StockData
 
 
+class ListOptimizedAdmin(admin.ModelAdmin):
+    """Base admin that keeps changelist queries cheap on large tables"""
+    list_per_page = 50
+    show_full_result_count = False  # Skip the extra unfiltered COUNT(*)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).only(*self.list_display)
+
+
 @admin.register(StockPrediction)
-class StockPredictionAdmin(admin.ModelAdmin):
+class StockPredictionAdmin(ListOptimizedAdmin):
     list_display = ('symbol', 'prediction_date', 'actual_price', 'predicted_price', 'confidence_score', 'model_version', 'created_at')
     list_filter = ('symbol', 'model_version', 'prediction_date', 'created_at')
     search_fields = ('symbol',)
@@ -24,7 +33,7 @@ class StockPredictionAdmin(admin.ModelAdmin):
 
 
 @admin.register(SentimentAnalysis)
-class SentimentAnalysisAdmin(admin.ModelAdmin):
+class SentimentAnalysisAdmin(ListOptimizedAdmin):
     list_display = ('text', 'sentiment', 'confidence', 'source', 'created_at')
     list_filter = ('sentiment', 'source', 'created_at')
     search_fields = ('text',)
@@ -45,7 +54,7 @@ class SentimentAnalysisAdmin(admin.ModelAdmin):
 
 
 @admin.register(StockData)
-class StockDataAdmin(admin.ModelAdmin):
+class StockDataAdmin(ListOptimizedAdmin):
     list_display = ('symbol', 'date', 'open_price', 'high_price', 'low_price', 'close_price', 'volume', 'created_at')
     list_filter = ('symbol', 'date', 'created_at')
     search_fields = ('symbol',)
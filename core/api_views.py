@@ -1,17 +1,107 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from celery.result import AsyncResult
+from concurrent.futures import Future
+import atexit
 import json
-import os
-import sys
+import orjson
+import queue
+import threading
+import time
 
-# Add the ml module to the path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'ml'))
-
-from ml.predictor import StockPredictor
+from ml.predictor import get_predictor
+from ml.tasks import train_model_task
 from .models import StockPrediction
 
 
+def ojson(data, status: int = 200) -> HttpResponse:
+    """Serialize an API payload with orjson, passing NumPy values through natively"""
+    return HttpResponse(
+        orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC),
+        status=status,
+        content_type='application/json'
+    )
+
+
+# Identical predictions currently being computed, keyed by request parameters
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _single_flight(key: str, fn):
+    """Run fn once per key at a time; concurrent callers share its result"""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    
+    if leader:
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+    
+    return future.result()
+
+
+# Predictions waiting to be bulk-inserted by the background writer
+_write_queue = queue.Queue()
+_writer_lock = threading.Lock()
+_writer_thread = None
+_WRITE_INTERVAL = 0.5
+_WRITE_BATCH_SIZE = 500
+
+
+def _flush_predictions():
+    """Insert every queued prediction in a single bulk query"""
+    batch = []
+    while True:
+        try:
+            batch.append(_write_queue.get_nowait())
+        except queue.Empty:
+            break
+    
+    if batch:
+        try:
+            # Request signals never fire on this thread, so recycle broken or
+            # expired connections (CONN_MAX_AGE / CONN_HEALTH_CHECKS) here
+            close_old_connections()
+            StockPrediction.objects.bulk_create(
+                batch, batch_size=_WRITE_BATCH_SIZE, ignore_conflicts=True
+            )
+        except Exception as e:
+            print(f"Error saving predictions: {str(e)}")
+
+
+def _run_writer():
+    """Background loop draining the prediction queue"""
+    while True:
+        time.sleep(_WRITE_INTERVAL)
+        _flush_predictions()
+
+
+def _save_prediction(prediction: StockPrediction):
+    """Queue a prediction for the background writer, starting it on first use"""
+    global _writer_thread
+    
+    if _writer_thread is None:
+        with _writer_lock:
+            if _writer_thread is None:
+                _writer_thread = threading.Thread(target=_run_writer, daemon=True)
+                _writer_thread.start()
+                atexit.register(_flush_predictions)
+    
+    _write_queue.put(prediction)
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def predict_stock(request):
@@ -22,42 +112,61 @@ def predict_stock(request):
         days_ahead = int(data.get('days_ahead', 1))
         
         if not symbol:
-            return JsonResponse({
+            return ojson({
                 'status': 'error',
                 'message': 'Stock symbol is required'
             }, status=400)
         
-        # Initialize predictor
-        predictor = StockPredictor()
+        # Serve repeat requests from the response cache
+        cache_key = f'predict:{symbol}:{days_ahead}'
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return ojson(cached)
         
-        # Make prediction
-        result = predictor.predict_stock_price(symbol, days_ahead)
+        def _predict():
+            # Reuse the cached predictor, picking up models trained by workers
+            predictor = get_predictor()
+            predictor.reload_if_updated()
+            
+            # Make prediction
+            result = predictor.predict_stock_price(symbol, days_ahead)
+            
+            if result['status'] == 'success':
+                # Save prediction to database in the next batch
+                _save_prediction(StockPrediction(
+                    symbol=symbol,
+                    predicted_price=result['predicted_price'],
+                    confidence_score=result['confidence']
+                ))
+                
+                cache.set(cache_key, {
+                    'status': 'success',
+                    'data': result
+                }, settings.PREDICTION_CACHE_TTL)
+            
+            return result
+        
+        # Concurrent identical requests share a single forward pass
+        result = _single_flight(cache_key, _predict)
         
         if result['status'] == 'success':
-            # Save prediction to database
-            StockPrediction.objects.create(
-                symbol=symbol,
-                predicted_price=result['predicted_price'],
-                confidence_score=result['confidence']
-            )
-            
-            return JsonResponse({
+            return ojson({
                 'status': 'success',
                 'data': result
             })
         else:
-            return JsonResponse({
+            return ojson({
                 'status': 'error',
                 'message': result['message']
             }, status=400)
             
     except json.JSONDecodeError:
-        return JsonResponse({
+        return ojson({
             'status': 'error',
             'message': 'Invalid JSON data'
         }, status=400)
     except Exception as e:
-        return JsonResponse({
+        return ojson({
             'status': 'error',
             'message': f'An error occurred: {str(e)}'
         }, status=500)
@@ -70,30 +179,39 @@ def get_stock_info(request, symbol):
         symbol = symbol.upper().strip()
         
         if not symbol:
-            return JsonResponse({
+            return ojson({
                 'status': 'error',
                 'message': 'Stock symbol is required'
             }, status=400)
         
-        # Initialize predictor
-        predictor = StockPredictor()
+        # Serve repeat requests from the response cache
+        cache_key = f'stock_info:{symbol}'
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return ojson(cached)
+        
+        # Reuse the cached predictor
+        predictor = get_predictor()
         
         # Get stock info
         result = predictor.get_stock_info(symbol)
         
         if result['status'] == 'success':
-            return JsonResponse({
+            payload = {
                 'status': 'success',
                 'data': result
-            })
+            }
+            cache.set(cache_key, payload, settings.STOCK_INFO_CACHE_TTL)
+            
+            return ojson(payload)
         else:
-            return JsonResponse({
+            return ojson({
                 'status': 'error',
                 'message': result['message']
             }, status=400)
             
     except Exception as e:
-        return JsonResponse({
+        return ojson({
             'status': 'error',
             'message': f'An error occurred: {str(e)}'
         }, status=500)
@@ -102,7 +220,7 @@ def get_stock_info(request, symbol):
 @csrf_exempt
 @require_http_methods(["POST"])
 def train_model(request):
-    """API endpoint to train the LSTM model"""
+    """API endpoint to queue LSTM model training"""
     try:
         data = json.loads(request.body)
         symbol = data.get('symbol', '').upper().strip()
@@ -110,35 +228,53 @@ def train_model(request):
         epochs = int(data.get('epochs', 50))
         
         if not symbol:
-            return JsonResponse({
+            return ojson({
                 'status': 'error',
                 'message': 'Stock symbol is required'
             }, status=400)
         
-        # Initialize predictor
-        predictor = StockPredictor()
-        
-        # Train model
-        result = predictor.train_model(symbol, period, epochs=epochs)
+        # Queue training on a Celery worker instead of blocking the request
+        job = train_model_task.delay(symbol, period, epochs)
         
-        if result['status'] == 'success':
-            return JsonResponse({
-                'status': 'success',
-                'data': result
-            })
-        else:
-            return JsonResponse({
-                'status': 'error',
-                'message': result['message']
-            }, status=400)
+        return ojson({
+            'status': 'queued',
+            'task_id': job.id
+        }, status=202)
             
     except json.JSONDecodeError:
-        return JsonResponse({
+        return ojson({
             'status': 'error',
             'message': 'Invalid JSON data'
         }, status=400)
     except Exception as e:
-        return JsonResponse({
+        return ojson({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+def train_status(request, task_id):
+    """API endpoint to check the state of a queued training job"""
+    try:
+        job = AsyncResult(task_id)
+        
+        data = {
+            'task_id': task_id,
+            'state': job.state
+        }
+        if job.successful():
+            data['result'] = job.result
+        elif job.failed():
+            data['result'] = str(job.result)
+        
+        return ojson({
+            'status': 'success',
+            'data': data
+        })
+            
+    except Exception as e:
+        return ojson({
             'status': 'error',
             'message': f'An error occurred: {str(e)}'
         }, status=500)
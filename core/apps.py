@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+import os
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+    
+    def ready(self):
+        """Load and warm the shared predictor before the first request"""
+        # Only web-server processes warm up: the runserver autoreloader's child in
+        # development, or processes that opt in with PREDICTOR_WARMUP=1 (set by
+        # wsgi.py/asgi.py). Management commands and the Celery parent, which TF
+        # must not be forked from, never load the model here
+        if os.environ.get('RUN_MAIN') or os.environ.get('PREDICTOR_WARMUP') == '1':
+            from ml.predictor import get_predictor
+            try:
+                get_predictor().warmup()
+            except Exception as e:
+                print(f"Could not warm up predictor: {str(e)}")
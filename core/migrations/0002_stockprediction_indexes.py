@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-14 05:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stockprediction',
+            index=models.Index(fields=['symbol', '-created_at'], name='core_stockp_symbol_72dd41_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockprediction',
+            index=models.Index(fields=['symbol', 'prediction_date'], name='core_stockp_symbol_ae9564_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.23 on 2026-10-14 05:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_stockprediction_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sentimentanalysis',
+            name='confidence',
+            field=models.FloatField(),
+        ),
+        migrations.AlterField(
+            model_name='stockdata',
+            name='close_price',
+            field=models.FloatField(),
+        ),
+        migrations.AlterField(
+            model_name='stockdata',
+            name='high_price',
+            field=models.FloatField(),
+        ),
+        migrations.AlterField(
+            model_name='stockdata',
+            name='low_price',
+            field=models.FloatField(),
+        ),
+        migrations.AlterField(
+            model_name='stockdata',
+            name='open_price',
+            field=models.FloatField(),
+        ),
+        migrations.AlterField(
+            model_name='stockprediction',
+            name='actual_price',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='stockprediction',
+            name='confidence_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='stockprediction',
+            name='predicted_price',
+            field=models.FloatField(),
+        ),
+    ]
@@ -6,14 +6,18 @@ class StockPrediction(models.Model):
     """Model to store stock prediction results"""
     symbol = models.CharField(max_length=10)
     prediction_date = models.DateTimeField(default=timezone.now)
-    actual_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
-    predicted_price = models.DecimalField(max_digits=10, decimal_places=2)
-    confidence_score = models.DecimalField(max_digits=5, decimal_places=4, null=True, blank=True)
+    actual_price = models.FloatField(null=True, blank=True)
+    predicted_price = models.FloatField()
+    confidence_score = models.FloatField(null=True, blank=True)
     model_version = models.CharField(max_length=50, default='LSTM_v1')
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['symbol', '-created_at']),
+            models.Index(fields=['symbol', 'prediction_date']),
+        ]
     
     def __str__(self):
         return f"{self.symbol} - {self.prediction_date.strftime('%Y-%m-%d')}"
@@ -29,7 +33,7 @@ class SentimentAnalysis(models.Model):
     
     text = models.TextField()
     sentiment = models.CharField(max_length=10, choices=SENTIMENT_CHOICES)
-    confidence = models.DecimalField(max_digits=5, decimal_places=4)
+    confidence = models.FloatField()
     source = models.CharField(max_length=100, default='Financial News')
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -40,18 +44,44 @@ class SentimentAnalysis(models.Model):
         return f"{self.sentiment} - {self.text[:50]}..."
 
 
+class StockDataQuerySet(models.QuerySet):
+    """Price lookups computed in the database rather than in pandas"""
+    
+    def latest_close(self, symbol):
+        """Return the most recent closing price for a symbol, or None"""
+        return (self.filter(symbol=symbol)
+                .order_by('-date')
+                .values_list('close_price', flat=True)
+                .first())
+    
+    def price_change(self, symbol, days=1):
+        """Return the closing price change over the last `days` rows, in percent"""
+        prices = list(self.filter(symbol=symbol)
+                      .order_by('-date')
+                      .values_list('close_price', flat=True)[:days + 1])
+        
+        # No change can be computed without enough rows or from a zero price
+        if len(prices) < days + 1 or not prices[-1]:
+            return 0.0
+        
+        return (prices[0] - prices[-1]) / prices[-1] * 100
+
+
 class StockData(models.Model):
     """Model to store historical stock data"""
     symbol = models.CharField(max_length=10)
     date = models.DateField()
-    open_price = models.DecimalField(max_digits=10, decimal_places=2)
-    high_price = models.DecimalField(max_digits=10, decimal_places=2)
-    low_price = models.DecimalField(max_digits=10, decimal_places=2)
-    close_price = models.DecimalField(max_digits=10, decimal_places=2)
+    open_price = models.FloatField()
+    high_price = models.FloatField()
+    low_price = models.FloatField()
+    close_price = models.FloatField()
     volume = models.BigIntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = StockDataQuerySet.as_manager()
+    
     class Meta:
+        # Also serves as the (symbol, date) index for latest-price lookups
         unique_together = ['symbol', 'date']
         ordering = ['-date']
     
@@ -2,16 +2,18 @@ from django.shortcuts import render
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_headers
 import json
-import os
-import sys
-
-# Add the ml module to the path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'ml'))
 
 from .models import StockPrediction
 
+# The pages below render static context, so cache the rendered response
+PAGE_CACHE_TIMEOUT = 60 * 60
+
 
+@cache_page(PAGE_CACHE_TIMEOUT)
+@vary_on_headers('Accept-Encoding')
 def home(request):
     """Home page view"""
     context = {
@@ -21,6 +23,8 @@ def home(request):
     return render(request, 'core/home.html', context)
 
 
+@cache_page(PAGE_CACHE_TIMEOUT)
+@vary_on_headers('Accept-Encoding')
 def prediction(request):
     """Prediction page view with TradingView widgets"""
     context = {
@@ -30,6 +34,8 @@ def prediction(request):
     return render(request, 'core/prediction.html', context)
 
 
+@cache_page(PAGE_CACHE_TIMEOUT)
+@vary_on_headers('Accept-Encoding')
 def news_sentiment(request):
     """News and Sentiment Analysis page view"""
     context = {
@@ -39,6 +45,8 @@ def news_sentiment(request):
     return render(request, 'core/news_sentiment.html', context)
 
 
+@cache_page(PAGE_CACHE_TIMEOUT)
+@vary_on_headers('Accept-Encoding')
 def about(request):
     """About page view"""
     context = {
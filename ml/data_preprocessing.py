@@ -1,10 +1,28 @@
 import pandas as pd
 import numpy as np
+try:
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # NumPy < 1.20
+    sliding_window_view = None
 from sklearn.preprocessing import MinMaxScaler
 import yfinance as yf
-from typing import Tuple, Optional
+from collections import OrderedDict
+from typing import Dict, Tuple, Optional
+import os
+import threading
+import time
+import joblib
 import warnings
-warnings.filterwarnings('ignore')
+
+# yfinance emits pandas FutureWarnings on every fetch; silence only those
+warnings.filterwarnings('ignore', category=FutureWarning, module='yfinance')
+
+# Parsed history per (symbol, period, tail), shared by every preprocessor in the process.
+# Symbols come from request URLs, so the cache is an LRU capped at DATA_CACHE_MAX_ENTRIES
+DATA_CACHE_TTL = 300
+DATA_CACHE_MAX_ENTRIES = 256
+_data_cache: 'OrderedDict[Tuple[str, str, Optional[int]], Tuple[float, pd.DataFrame]]' = OrderedDict()
+_data_cache_lock = threading.Lock()
 
 
 class StockDataPreprocessor:
@@ -18,21 +36,97 @@ class StockDataPreprocessor:
             sequence_length (int): Number of time steps to look back for LSTM
         """
         self.sequence_length = sequence_length
+        # Columns fed to the model, in order (can be extended to other OHLCV columns)
+        self.feature_columns = ['Close']
         self.scaler = MinMaxScaler(feature_range=(0, 1))
         self.is_fitted = False
     
-    def fetch_stock_data(self, symbol: str, period: str = "2y") -> pd.DataFrame:
+    def load_scaler(self, scaler_path: str) -> bool:
         """
-        Fetch stock data from Yahoo Finance
+        Load a previously fitted scaler
+        
+        Args:
+            scaler_path (str): Path to the saved scaler
+        
+        Returns:
+            bool: True if the scaler was loaded, False otherwise
+        """
+        try:
+            if os.path.exists(scaler_path):
+                self.scaler = joblib.load(scaler_path)
+                self.is_fitted = True
+                return True
+            else:
+                print(f"No saved scaler found at {scaler_path}")
+                return False
+        except Exception as e:
+            print(f"Error loading scaler: {str(e)}")
+            return False
+    
+    def fetch_stock_data(self, symbol: str, period: str = "2y", force: bool = False,
+                         tail: Optional[int] = None) -> pd.DataFrame:
+        """
+        Fetch stock data from Yahoo Finance, reusing results fetched in the last DATA_CACHE_TTL seconds
         
         Args:
             symbol (str): Stock symbol (e.g., 'AAPL', 'GOOGL')
             period (str): Time period to fetch ('1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max')
+            force (bool): Bypass the cache and always download fresh data
+            tail (Optional[int]): Keep only the most recent rows, so callers that need a
+                short window don't hold (or cache) the full history
+        
+        Returns:
+            pd.DataFrame: Stock data with OHLCV columns (shared with the cache, do not modify)
+        """
+        key = (symbol, period, tail)
+        
+        if not force:
+            with _data_cache_lock:
+                cached = _data_cache.get(key)
+                if cached is not None:
+                    if time.time() - cached[0] < DATA_CACHE_TTL:
+                        _data_cache.move_to_end(key)
+                        return cached[1]
+                    del _data_cache[key]
+        
+        data = self._download_stock_data(symbol, period)
+        
+        if tail is not None:
+            # Copy so the full download can be freed instead of backing the slice
+            data = data.iloc[-tail:].reset_index(drop=True).copy()
+        
+        now = time.time()
+        with _data_cache_lock:
+            _data_cache[key] = (now, data)
+            _data_cache.move_to_end(key)
+            
+            # Drop expired entries, then the least recently used beyond the cap
+            for expired in [k for k, (fetched, _) in _data_cache.items() if now - fetched >= DATA_CACHE_TTL]:
+                del _data_cache[expired]
+            while len(_data_cache) > DATA_CACHE_MAX_ENTRIES:
+                _data_cache.popitem(last=False)
+        
+        return data
+    
+    def clear_cache(self):
+        """Drop all cached stock data"""
+        with _data_cache_lock:
+            _data_cache.clear()
+    
+    def _download_stock_data(self, symbol: str, period: str) -> pd.DataFrame:
+        """
+        Download stock data from Yahoo Finance
+        
+        Args:
+            symbol (str): Stock symbol
+            period (str): Time period to fetch
         
         Returns:
             pd.DataFrame: Stock data with OHLCV columns
         """
         try:
+            # yfinance manages its own (curl_cffi) session; repeat fetches are
+            # deduplicated by _data_cache instead of an HTTP-level cache
             ticker = yf.Ticker(symbol)
             data = ticker.history(period=period)
             
@@ -47,7 +141,8 @@ class StockDataPreprocessor:
             if not all(col in data.columns for col in required_columns):
                 raise ValueError(f"Missing required columns. Available: {data.columns.tolist()}")
             
-            return data
+            # Keep only the OHLCV columns so the cached frame is a single compact float block
+            return data[required_columns]
             
         except Exception as e:
             raise Exception(f"Error fetching data for {symbol}: {str(e)}")
@@ -62,8 +157,8 @@ class StockDataPreprocessor:
         Returns:
             np.ndarray: Scaled features ready for LSTM
         """
-        # Select only the 'Close' price for now (can be extended to include other features)
-        features = data[['Close']].values
+        # Extract all feature columns in one pass as a contiguous float32 matrix
+        features = data[self.feature_columns].to_numpy(dtype=np.float32)
         
         # Scale the features
         if not self.is_fitted:
@@ -74,23 +169,41 @@ class StockDataPreprocessor:
         
         return features_scaled
     
-    def create_sequences(self, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    def create_sequences(self, data: np.ndarray, as_view: bool = False) -> Tuple[np.ndarray, np.ndarray]:
         """
         Create sequences for LSTM training
         
         Args:
             data (np.ndarray): Scaled feature data
+            as_view (bool): Return read-only strided views over data instead of copies
         
         Returns:
             Tuple[np.ndarray, np.ndarray]: X (input sequences) and y (target values)
         """
-        X, y = [], []
+        n_samples = len(data) - self.sequence_length
+        if n_samples <= 0:
+            return (np.empty((0, self.sequence_length, data.shape[1]), dtype=data.dtype),
+                    np.empty((0,), dtype=data.dtype))
         
-        for i in range(self.sequence_length, len(data)):
-            X.append(data[i-self.sequence_length:i])
-            y.append(data[i, 0])  # Predict the next close price
+        if sliding_window_view is None:
+            # Fill preallocated buffers instead of building a list of arrays
+            X = np.empty((n_samples, self.sequence_length, data.shape[1]), dtype=data.dtype)
+            y = np.empty(n_samples, dtype=data.dtype)
+            for i in range(n_samples):
+                X[i] = data[i:i + self.sequence_length]
+                y[i] = data[i + self.sequence_length, 0]
+            return X, y
         
-        return np.array(X), np.array(y)
+        # Every window as a strided view: (n_samples, features, sequence_length)
+        windows = sliding_window_view(data[:-1], self.sequence_length, axis=0)
+        X = windows.transpose(0, 2, 1)
+        y = data[self.sequence_length:, 0]  # Predict the next close price
+        
+        if as_view:
+            return X, y
+        
+        # One contiguous copy in (n_samples, sequence_length, features) layout
+        return np.ascontiguousarray(X), y.copy()
     
     def inverse_transform(self, data: np.ndarray) -> np.ndarray:
         """
@@ -111,6 +224,33 @@ class StockDataPreprocessor:
         
         return self.scaler.inverse_transform(data)
     
+    def inverse_transform_target(self, data: np.ndarray, target_col: int = 0) -> np.ndarray:
+        """
+        Inverse transform a batch of scaled predictions for a single target column
+        
+        For a MinMaxScaler this is one multiply-add over the batch, skipping
+        sklearn's per-call input validation.
+        
+        Args:
+            data (np.ndarray): Scaled predictions of shape (n,) or (n, 1)
+            target_col (int): Index of the predicted column in feature_columns
+        
+        Returns:
+            np.ndarray: Predictions in original scale, shape (n,)
+        """
+        if not self.is_fitted:
+            raise ValueError("Scaler must be fitted before inverse transform")
+        
+        values = np.asarray(data, dtype=np.float64).reshape(-1)
+        
+        if isinstance(self.scaler, MinMaxScaler):
+            return (values - self.scaler.min_[target_col]) / self.scaler.scale_[target_col]
+        
+        # Generic scalers need the full feature width
+        padded = np.zeros((len(values), len(self.feature_columns)))
+        padded[:, target_col] = values
+        return self.scaler.inverse_transform(padded)[:, target_col]
+    
     def prepare_prediction_data(self, data: pd.DataFrame) -> np.ndarray:
         """
         Prepare the most recent data for prediction
@@ -121,13 +261,18 @@ class StockDataPreprocessor:
         Returns:
             np.ndarray: Last sequence_length rows ready for prediction
         """
-        features = self.prepare_features(data)
+        if not self.is_fitted:
+            raise ValueError("Scaler must be fitted before preparing prediction data")
         
-        # Get the last sequence_length rows
-        last_sequence = features[-self.sequence_length:]
+        # Only the last sequence_length rows need scaling
+        last_rows = data[self.feature_columns].iloc[-self.sequence_length:]
+        last_sequence = self.scaler.transform(last_rows.to_numpy(dtype=np.float32))
+        
+        # Match the model's float32 input so Keras/TFLite don't cast a hidden copy
+        last_sequence = np.ascontiguousarray(last_sequence, dtype=np.float32)
         
         # Reshape for LSTM input (batch_size, sequence_length, features)
-        return last_sequence.reshape(1, self.sequence_length, 1)
+        return last_sequence.reshape(1, self.sequence_length, len(self.feature_columns))
     
     def get_latest_price(self, data: pd.DataFrame) -> float:
         """
@@ -139,12 +284,14 @@ class StockDataPreprocessor:
         Returns:
             float: Latest closing price
         """
-        return float(data['Close'].iloc[-1])
+        return float(data['Close'].iat[-1])
     
     def get_price_change(self, data: pd.DataFrame, days: int = 1) -> float:
         """
         Calculate price change over specified days
         
+        Prefer get_price_changes when more than one window is needed.
+        
         Args:
             data (pd.DataFrame): Stock data
             days (int): Number of days to look back
@@ -152,10 +299,23 @@ class StockDataPreprocessor:
         Returns:
             float: Price change percentage
         """
-        if len(data) < days + 1:
-            return 0.0
+        return self.get_price_changes(data, (days,))[days]
+    
+    def get_price_changes(self, data: pd.DataFrame, days: Tuple[int, ...] = (1, 7, 30)) -> Dict[int, float]:
+        """
+        Calculate price changes over several windows from one Close vector
+        
+        Args:
+            data (pd.DataFrame): Stock data
+            days (Tuple[int, ...]): Numbers of days to look back
         
-        current_price = data['Close'].iloc[-1]
-        previous_price = data['Close'].iloc[-1-days]
+        Returns:
+            Dict[int, float]: Price change percentage per window (0.0 when there is not enough data)
+        """
+        closes = data['Close'].to_numpy(dtype=np.float64)
+        current_price = closes[-1]
         
-        return ((current_price - previous_price) / previous_price) * 100
+        return {
+            n: float((current_price - closes[-1-n]) / closes[-1-n] * 100) if len(closes) > n else 0.0
+            for n in days
+        }
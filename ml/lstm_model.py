@@ -1,32 +1,111 @@
 import numpy as np
 import pandas as pd
+import tensorflow as tf
 from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
 import os
+import threading
 import joblib
 from typing import Tuple, Optional
 import warnings
-warnings.filterwarnings('ignore')
+
+try:
+    import onnxruntime as ort
+    import tf2onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+except ImportError:  # ONNX serving is optional; fall back to TFLite/Keras
+    ort = None
+    tf2onnx = None
+    quantize_dynamic = None
+
+try:
+    import jax
+    import jax.numpy as jnp
+except ImportError:  # JAX inference is optional
+    jax = None
+    jnp = None
+
+# Largest mean absolute difference (in scaled units) tolerated between the
+# INT8 and FP32 ONNX models before the quantized model is discarded
+QUANTIZATION_MAX_DRIFT = 0.01
+
+# Keras warns about layer-construction conventions; silence only those
+warnings.filterwarnings('ignore', category=UserWarning, module='keras')
+
+
+class WindowSequence(tf.keras.utils.Sequence):
+    """Feeds minibatches from (possibly strided) window arrays, copying one batch at a time"""
+    
+    def __init__(self, X: np.ndarray, y: np.ndarray, batch_size: int = 32, shuffle: bool = True):
+        """
+        Initialize the batch generator
+        
+        Args:
+            X (np.ndarray): Input sequences, e.g. a sliding_window_view
+            y (np.ndarray): Target values
+            batch_size (int): Number of samples per batch
+            shuffle (bool): Reshuffle sample order after every epoch
+        """
+        super().__init__()
+        self.X = X
+        self.y = y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.indices = np.arange(len(X))
+        if shuffle:
+            np.random.shuffle(self.indices)
+    
+    def __len__(self) -> int:
+        return int(np.ceil(len(self.X) / self.batch_size))
+    
+    def __getitem__(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        batch = self.indices[index * self.batch_size:(index + 1) * self.batch_size]
+        return (np.ascontiguousarray(self.X[batch], dtype=np.float32),
+                np.ascontiguousarray(self.y[batch], dtype=np.float32))
+    
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.indices)
 
 
 class LSTMModel:
     """LSTM model for stock price prediction"""
     
-    def __init__(self, sequence_length: int = 60, features: int = 1):
+    def __init__(self, sequence_length: int = 60, features: int = 1, use_jax: bool = False):
         """
         Initialize LSTM model
         
         Args:
             sequence_length (int): Number of time steps to look back
             features (int): Number of features (1 for close price only)
+            use_jax (bool): Serve predictions through a jitted JAX forward pass when JAX is installed
         """
         self.sequence_length = sequence_length
         self.features = features
+        self.use_jax = use_jax and jax is not None
         self.model = None
         self.model_path = 'ml/saved_models/lstm_model.h5'
         self.scaler_path = 'ml/saved_models/scaler.pkl'
+        self.tflite_path = 'ml/saved_models/lstm_model.tflite'
+        self.infer_model_path = 'ml/saved_models/lstm_infer.h5'
+        self.onnx_path = 'ml/saved_models/lstm_model.onnx'
+        self.onnx_int8_path = 'ml/saved_models/lstm_model.int8.onnx'
+        
+        # ONNX Runtime session used for every batch size when available
+        self._ort_session = None
+        self._ort_input_name = None
+        
+        # Lean TFLite runtime used for single-sample inference when available
+        self._interpreter = None
+        self._interpreter_lock = threading.Lock()
+        
+        # XLA-compiled single-sample forward pass, bound to the current model
+        self._infer = None
+        
+        # Jitted JAX forward pass over the current weights (only with use_jax)
+        self._jax_predict = None
         
         # Create directory for saved models
         os.makedirs('ml/saved_models', exist_ok=True)
@@ -83,14 +162,27 @@ class LSTMModel:
         Returns:
             dict: Training history
         """
-        # Build the model
+        # Build the model; the old ONNX/TFLite exports no longer match it
         self.model = self.build_model()
+        self._ort_session = None
+        self._interpreter = None
+        self._infer = None
+        self._jax_predict = None
         
         # Prepare validation data
         validation_data = None
         if X_val is not None and y_val is not None:
             validation_data = (X_val, y_val)
         
+        # Strided window views are batched lazily instead of materialized in full
+        fit_kwargs = {'batch_size': batch_size}
+        if not X_train.flags['C_CONTIGUOUS']:
+            X_train = WindowSequence(X_train, y_train, batch_size=batch_size)
+            y_train = None
+            fit_kwargs = {}
+            if validation_data is not None:
+                validation_data = WindowSequence(X_val, y_val, batch_size=batch_size, shuffle=False)
+        
         # Callbacks for better training
         callbacks = [
             EarlyStopping(
@@ -113,12 +205,16 @@ class LSTMModel:
             X_train, y_train,
             validation_data=validation_data,
             epochs=epochs,
-            batch_size=batch_size,
             callbacks=callbacks,
-            verbose=1
+            verbose=1,
+            **fit_kwargs
         )
         
-        return history.history
+        self._build_infer_fn()
+        self._build_jax_fn()
+        
+        # Plain floats, so the history can be returned as a JSON Celery result
+        return {name: [float(v) for v in values] for name, values in history.history.items()}
     
     def predict(self, X: np.ndarray) -> np.ndarray:
         """
@@ -133,28 +229,350 @@ class LSTMModel:
         if self.model is None:
             raise ValueError("Model must be trained or loaded before making predictions")
         
+        # Prefer JAX when requested, then ONNX Runtime, then single-sample TFLite or XLA, then Keras
+        if self._jax_predict is not None:
+            return np.asarray(self._jax_predict(jnp.asarray(X, dtype=jnp.float32)))
+        
+        if self._ort_session is not None:
+            return self._predict_onnx(X)
+        
+        if X.shape[0] == 1:
+            if self._interpreter is not None:
+                return self._predict_tflite(X)
+            if self._infer is not None:
+                return self._infer(tf.constant(X, dtype=tf.float32)).numpy()
+        
         return self.model.predict(X, verbose=0)
     
-    def save_model(self, model_path: str = None, scaler=None):
+    def _build_infer_fn(self):
+        """Compile a fixed-shape forward pass that skips Model.predict overhead"""
+        model = self.model
+        
+        @tf.function(
+            jit_compile=True,
+            input_signature=[tf.TensorSpec([1, self.sequence_length, self.features], tf.float32)]
+        )
+        def _infer(x):
+            return model(x, training=False)
+        
+        self._infer = _infer
+    
+    def _build_jax_fn(self):
+        """Rebuild the forward pass in JAX from the Keras weights and jit-compile it"""
+        self._jax_predict = None
+        
+        if not self.use_jax or self.model is None:
+            return
+        
+        # Weights in layer order; Dropout is the identity at inference time
+        lstm_weights = []
+        dense_weights = []
+        for layer in self.model.layers:
+            if isinstance(layer, LSTM):
+                kernel, recurrent_kernel, bias = layer.get_weights()
+                lstm_weights.append((jnp.asarray(kernel), jnp.asarray(recurrent_kernel), jnp.asarray(bias)))
+            elif isinstance(layer, Dense):
+                kernel, bias = layer.get_weights()
+                dense_weights.append((jnp.asarray(kernel), jnp.asarray(bias)))
+        
+        def lstm_layer(x, kernel, recurrent_kernel, bias):
+            # x: (time, batch, inputs); Keras gate order is input, forget, cell, output
+            units = recurrent_kernel.shape[0]
+            projected = x @ kernel + bias
+            
+            def cell(carry, z_x):
+                h, c = carry
+                z = z_x + h @ recurrent_kernel
+                i = jax.nn.sigmoid(z[:, :units])
+                f = jax.nn.sigmoid(z[:, units:2 * units])
+                g = jnp.tanh(z[:, 2 * units:3 * units])
+                o = jax.nn.sigmoid(z[:, 3 * units:])
+                c = f * c + i * g
+                h = o * jnp.tanh(c)
+                return (h, c), h
+            
+            zeros = jnp.zeros((x.shape[1], units), dtype=x.dtype)
+            _, outputs = jax.lax.scan(cell, (zeros, zeros), projected)
+            return outputs
+        
+        @jax.jit
+        def forward(X):
+            x = jnp.swapaxes(X, 0, 1)
+            for kernel, recurrent_kernel, bias in lstm_weights:
+                x = lstm_layer(x, kernel, recurrent_kernel, bias)
+            x = x[-1]
+            for kernel, bias in dense_weights:
+                x = x @ kernel + bias
+            return x
+        
+        self._jax_predict = forward
+    
+    def _predict_onnx(self, X: np.ndarray) -> np.ndarray:
+        """
+        Run one forward pass on the ONNX Runtime session
+        
+        Args:
+            X (np.ndarray): Input sequences of shape (batch, sequence_length, features)
+        
+        Returns:
+            np.ndarray: Predicted values
+        """
+        inputs = {self._ort_input_name: X.astype(np.float32, copy=False)}
+        return self._ort_session.run(None, inputs)[0]
+    
+    def export_onnx(self, onnx_path: str = None) -> bool:
+        """
+        Convert the Dropout-free inference model to ONNX with a dynamic batch axis
+        
+        Args:
+            onnx_path (str): Path to save the ONNX model
+        
+        Returns:
+            bool: True if the model was exported, False otherwise
+        """
+        if onnx_path is None:
+            onnx_path = self.onnx_path
+        
+        if self.model is None:
+            return False
+        
+        # Never leave an ONNX model from a previous training run behind
+        if os.path.exists(onnx_path):
+            os.remove(onnx_path)
+        
+        if tf2onnx is None:
+            return False
+        
+        try:
+            spec = (tf.TensorSpec((None, self.sequence_length, self.features), tf.float32, name='input'),)
+            tf2onnx.convert.from_keras(self.build_inference_model(), input_signature=spec,
+                                       output_path=onnx_path)
+            print(f"ONNX model saved to {onnx_path}")
+            return True
+        except Exception as e:
+            print(f"Error exporting ONNX model: {str(e)}")
+            return False
+    
+    def quantize_onnx(self, X_val: np.ndarray = None, max_samples: int = 256) -> bool:
+        """
+        Quantize the exported ONNX model weights to INT8 and check its drift
+        
+        The quantized model is kept only if its predictions on the validation
+        slice stay within QUANTIZATION_MAX_DRIFT of the FP32 model.
+        
+        Args:
+            X_val (np.ndarray): Validation input sequences used to measure drift
+            max_samples (int): Number of trailing validation samples to compare
+        
+        Returns:
+            bool: True if the INT8 model was saved, False otherwise
+        """
+        # Never leave an INT8 model from a previous training run behind
+        if os.path.exists(self.onnx_int8_path):
+            os.remove(self.onnx_int8_path)
+        
+        if quantize_dynamic is None or X_val is None or len(X_val) == 0:
+            return False
+        
+        try:
+            quantize_dynamic(self.onnx_path, self.onnx_int8_path, weight_type=QuantType.QInt8)
+            
+            sample = np.ascontiguousarray(X_val[-max_samples:], dtype=np.float32)
+            predictions = []
+            for path in (self.onnx_path, self.onnx_int8_path):
+                session = ort.InferenceSession(path, providers=['CPUExecutionProvider'])
+                predictions.append(session.run(None, {session.get_inputs()[0].name: sample})[0])
+            
+            drift = float(np.mean(np.abs(predictions[0] - predictions[1])))
+            if drift > QUANTIZATION_MAX_DRIFT:
+                print(f"INT8 model drift {drift:.4f} too large, keeping FP32 model")
+                os.remove(self.onnx_int8_path)
+                return False
+            
+            print(f"INT8 model saved to {self.onnx_int8_path} (drift {drift:.4f})")
+            return True
+        except Exception as e:
+            print(f"Error quantizing ONNX model: {str(e)}")
+            if os.path.exists(self.onnx_int8_path):
+                os.remove(self.onnx_int8_path)
+            return False
+    
+    def load_onnx(self, onnx_path: str = None) -> bool:
+        """
+        Load the ONNX model into a CPU ONNX Runtime session
+        
+        Args:
+            onnx_path (str): Path to the saved ONNX model (defaults to the INT8
+                model when one passed the drift check)
+        
+        Returns:
+            bool: True if the session is ready, False otherwise
+        """
+        if onnx_path is None:
+            onnx_path = self.onnx_path
+            if os.path.exists(self.onnx_int8_path):
+                onnx_path = self.onnx_int8_path
+        
+        self._ort_session = None
+        
+        if ort is None:
+            return False
+        
+        try:
+            if not os.path.exists(onnx_path):
+                return False
+            
+            session = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+            self._ort_input_name = session.get_inputs()[0].name
+            self._ort_session = session
+            return True
+        except Exception as e:
+            print(f"Error loading ONNX model: {str(e)}")
+            return False
+    
+    def _predict_tflite(self, X: np.ndarray) -> np.ndarray:
+        """
+        Run one forward pass on the TFLite interpreter
+        
+        Args:
+            X (np.ndarray): Input sequence of shape (1, sequence_length, features)
+        
+        Returns:
+            np.ndarray: Predicted values
+        """
+        input_index = self._input_details['index']
+        output_index = self._output_details['index']
+        
+        # The interpreter holds internal buffers, so calls cannot overlap
+        with self._interpreter_lock:
+            self._interpreter.set_tensor(input_index, X.astype(np.float32, copy=False))
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(output_index).copy()
+    
+    def export_tflite(self, tflite_path: str = None) -> bool:
+        """
+        Convert the trained model to a dynamic-range quantized TFLite model
+        
+        Args:
+            tflite_path (str): Path to save the TFLite model
+        
+        Returns:
+            bool: True if the model was exported, False otherwise
+        """
+        if tflite_path is None:
+            tflite_path = self.tflite_path
+        
+        if self.model is None:
+            return False
+        
+        # Never leave a TFLite model from a previous training run behind
+        if os.path.exists(tflite_path):
+            os.remove(tflite_path)
+        
+        try:
+            converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            with open(tflite_path, 'wb') as f:
+                f.write(converter.convert())
+            print(f"TFLite model saved to {tflite_path}")
+            return True
+        except Exception as e:
+            print(f"Error exporting TFLite model: {str(e)}")
+            return False
+    
+    def load_tflite(self, tflite_path: str = None) -> bool:
+        """
+        Load the TFLite model used for single-sample inference
+        
+        Args:
+            tflite_path (str): Path to the saved TFLite model
+        
+        Returns:
+            bool: True if the interpreter is ready, False otherwise
+        """
+        if tflite_path is None:
+            tflite_path = self.tflite_path
+        
+        self._interpreter = None
+        
+        try:
+            if not os.path.exists(tflite_path):
+                return False
+            
+            interpreter = tf.lite.Interpreter(model_path=tflite_path)
+            interpreter.allocate_tensors()
+            self._input_details = interpreter.get_input_details()[0]
+            self._output_details = interpreter.get_output_details()[0]
+            self._interpreter = interpreter
+            return True
+        except Exception as e:
+            print(f"Error loading TFLite model: {str(e)}")
+            return False
+    
+    def save_model(self, model_path: str = None, scaler=None, X_val: np.ndarray = None):
         """
         Save the trained model and scaler
         
         Args:
             model_path (str): Path to save the model
             scaler: Scaler object to save
+            X_val (np.ndarray): Validation sequences used to vet the INT8 model
         """
         if model_path is None:
             model_path = self.model_path
         
-        # Save the model
-        if self.model is not None:
-            self.model.save(model_path)
-            print(f"Model saved to {model_path}")
-        
         # Save the scaler
         if scaler is not None:
             joblib.dump(scaler, self.scaler_path)
             print(f"Scaler saved to {self.scaler_path}")
+        
+        if self.model is not None:
+            # Write the serving artifacts first: other processes reload once
+            # the main model file changes
+            self.build_inference_model().save(self.infer_model_path)
+            print(f"Inference model saved to {self.infer_model_path}")
+            
+            # Export, quantize and switch to ONNX Runtime for serving. The previous
+            # run's ONNX files go first (export_onnx replaces the FP32 one), so a
+            # failed export can't leave other processes serving the old network
+            if os.path.exists(self.onnx_int8_path):
+                os.remove(self.onnx_int8_path)
+            if self.export_onnx():
+                self.quantize_onnx(X_val)
+            # Also drops this process's old session when nothing was exported
+            self.load_onnx()
+            
+            # Export and switch to the TFLite runtime for serving; load_tflite also
+            # drops this process's old interpreter when nothing was exported
+            self.export_tflite()
+            self.load_tflite()
+            
+            # Save the model
+            self.model.save(model_path)
+            print(f"Model saved to {model_path}")
+    
+    def build_inference_model(self) -> Sequential:
+        """
+        Build a copy of the trained model without Dropout layers
+        
+        Dropout is the identity at inference time, so the copy predicts the
+        same values while scheduling fewer ops per forward pass.
+        
+        Returns:
+            Sequential: Inference-only model with the trained weights
+        """
+        if self.model is None:
+            raise ValueError("Model must be trained or loaded before building an inference model")
+        
+        layers = [layer for layer in self.model.layers if not isinstance(layer, Dropout)]
+        
+        infer = Sequential([layer.__class__.from_config(layer.get_config()) for layer in layers])
+        infer.build((None, self.sequence_length, self.features))
+        
+        for src, dst in zip(layers, infer.layers):
+            dst.set_weights(src.get_weights())
+        
+        return infer
     
     def load_model(self, model_path: str = None) -> bool:
         """
@@ -168,11 +586,19 @@ class LSTMModel:
         """
         if model_path is None:
             model_path = self.model_path
+            
+            # Serve from the Dropout-free copy when one was saved alongside
+            if os.path.exists(self.infer_model_path):
+                model_path = self.infer_model_path
         
         try:
             if os.path.exists(model_path):
-                self.model = load_model(model_path)
+                self.model = load_model(model_path, compile=False)
                 print(f"Model loaded from {model_path}")
+                self._build_infer_fn()
+                self._build_jax_fn()
+                self.load_onnx()
+                self.load_tflite()
                 return True
             else:
                 print(f"No saved model found at {model_path}")
@@ -229,11 +655,12 @@ class LSTMModel:
         # Calculate percentage error
         mape = np.mean(np.abs((y_test - y_pred.flatten()) / y_test)) * 100
         
+        # Plain floats (float32 inputs give np.float32), so metrics stay JSON-serializable
         return {
-            'mse': mse,
-            'rmse': rmse,
-            'mae': mae,
-            'mape': mape
+            'mse': float(mse),
+            'rmse': float(rmse),
+            'mae': float(mae),
+            'mape': float(mape)
         }
     
     def get_model_summary(self) -> str:
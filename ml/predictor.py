@@ -1,27 +1,52 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from .data_preprocessing import StockDataPreprocessor
 from .lstm_model import LSTMModel
-import warnings
-warnings.filterwarnings('ignore')
+
+# Process-wide predictor shared by the API views
+_predictor = None
+_predictor_lock = threading.Lock()
+
+
+def get_predictor() -> 'StockPredictor':
+    """Return the process-wide predictor, loading the saved model once"""
+    global _predictor
+    
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                # LSTM_USE_JAX=1 opts the API into the jitted JAX forward pass
+                _predictor = StockPredictor(use_jax=os.environ.get('LSTM_USE_JAX') == '1')
+    
+    return _predictor
 
 
 class StockPredictor:
     """Main class for stock price prediction using LSTM"""
     
-    def __init__(self, sequence_length: int = 60):
+    def __init__(self, sequence_length: int = 60, use_jax: bool = False):
         """
         Initialize the stock predictor
         
         Args:
             sequence_length (int): Number of time steps to look back
+            use_jax (bool): Run LSTM inference through JAX when it is installed
         """
         self.sequence_length = sequence_length
         self.preprocessor = StockDataPreprocessor(sequence_length)
-        self.lstm_model = LSTMModel(sequence_length)
+        self.lstm_model = LSTMModel(sequence_length, use_jax=use_jax)
         self.is_trained = False
+        self._model_mtime = None
+        # Inputs and results of the training run that produced the current model
+        self._train_signature = None
+        self._last_train_result = None
+        self._reload_lock = threading.Lock()
+        # Serializes forward passes when predictions run on worker threads
+        self._predict_lock = threading.Lock()
         
         # Try to load pre-trained model
         self._load_existing_model()
@@ -29,19 +54,61 @@ class StockPredictor:
     def _load_existing_model(self):
         """Try to load existing trained model"""
         try:
-            if self.lstm_model.load_model():
-                # Load the corresponding scaler
-                scaler = self.lstm_model.load_scaler()
-                if scaler is not None:
-                    self.preprocessor.scaler = scaler
-                    self.preprocessor.is_fitted = True
+            # Load into a fresh pair so in-flight predictions keep a consistent model and scaler
+            lstm_model = LSTMModel(self.sequence_length, use_jax=self.lstm_model.use_jax)
+            preprocessor = StockDataPreprocessor(self.sequence_length)
+            
+            if lstm_model.load_model():
+                # Load the corresponding fitted scaler
+                if preprocessor.load_scaler(lstm_model.scaler_path):
+                    with self._predict_lock:
+                        self.lstm_model, self.preprocessor = lstm_model, preprocessor
                     self.is_trained = True
+                    self._train_signature = None
+                    self._model_mtime = os.path.getmtime(lstm_model.model_path)
                     print("Pre-trained model loaded successfully")
         except Exception as e:
             print(f"Could not load existing model: {str(e)}")
     
+    def _serving_pair(self) -> Tuple[LSTMModel, StockDataPreprocessor]:
+        """
+        Get the model and scaler to serve one prediction with
+        
+        Returns:
+            Tuple[LSTMModel, StockDataPreprocessor]: A pair swapped in together by _load_existing_model
+        """
+        with self._predict_lock:
+            return self.lstm_model, self.preprocessor
+    
+    def _saved_model_mtime(self) -> Optional[float]:
+        """Modification time of the saved model file, or None if it is missing"""
+        try:
+            return os.path.getmtime(self.lstm_model.model_path)
+        except OSError:
+            return None
+    
+    def reload_if_updated(self) -> bool:
+        """
+        Reload the saved model if it was retrained by another process
+        
+        Returns:
+            bool: True if a newer model was loaded, False otherwise
+        """
+        mtime = self._saved_model_mtime()
+        if mtime is None:
+            return False
+        
+        if mtime == self._model_mtime:
+            return False
+        
+        with self._reload_lock:
+            if mtime != self._model_mtime:
+                self._load_existing_model()
+        return self._model_mtime == mtime
+    
     def train_model(self, symbol: str, period: str = "2y", 
-                   train_split: float = 0.8, epochs: int = 50) -> Dict:
+                   train_split: float = 0.8, epochs: int = 50,
+                   force_retrain: bool = False) -> Dict:
         """
         Train the LSTM model on stock data
         
@@ -50,22 +117,32 @@ class StockPredictor:
             period (str): Time period for training data
             train_split (float): Fraction of data to use for training
             epochs (int): Number of training epochs
+            force_retrain (bool): Retrain even if the current model was trained on identical data
         
         Returns:
             Dict: Training results and metrics
         """
         try:
             print(f"Fetching data for {symbol}...")
-            data = self.preprocessor.fetch_stock_data(symbol, period)
+            data = self.preprocessor.fetch_stock_data(symbol, period, force=True)
             
             if len(data) < self.sequence_length * 2:
                 raise ValueError(f"Insufficient data for {symbol}. Need at least {self.sequence_length * 2} data points")
             
+            # The current model already came from this exact run, so reuse its results,
+            # unless another process (e.g. a sibling Celery worker) has since overwritten
+            # the shared saved model
+            signature = (symbol, str(data['Date'].iat[-1]), len(data), train_split, epochs)
+            if (not force_retrain and self.is_trained and signature == self._train_signature
+                    and self._saved_model_mtime() == self._model_mtime):
+                print(f"Data for {symbol} unchanged since last training, skipping")
+                return self._last_train_result
+            
             print(f"Preparing features...")
             features_scaled = self.preprocessor.prepare_features(data)
             
             print(f"Creating sequences...")
-            X, y = self.preprocessor.create_sequences(features_scaled)
+            X, y = self.preprocessor.create_sequences(features_scaled, as_view=True)
             
             # Split data into train and validation sets
             split_idx = int(len(X) * train_split)
@@ -84,11 +161,12 @@ class StockPredictor:
             metrics = self.lstm_model.evaluate(X_val, y_val)
             
             # Save the trained model and scaler
-            self.lstm_model.save_model(scaler=self.preprocessor.scaler)
+            self.lstm_model.save_model(scaler=self.preprocessor.scaler, X_val=X_val)
             
             self.is_trained = True
+            self._model_mtime = os.path.getmtime(self.lstm_model.model_path)
             
-            return {
+            result = {
                 'status': 'success',
                 'symbol': symbol,
                 'training_samples': len(X_train),
@@ -97,6 +175,10 @@ class StockPredictor:
                 'metrics': metrics,
                 'message': f'Model trained successfully on {symbol} data'
             }
+            self._train_signature = signature
+            self._last_train_result = result
+            
+            return result
             
         except Exception as e:
             return {
@@ -122,47 +204,168 @@ class StockPredictor:
                     'message': 'Model not trained. Please train the model first.'
                 }
             
-            print(f"Fetching latest data for {symbol}...")
-            data = self.preprocessor.fetch_stock_data(symbol, "3mo")
-            
-            if len(data) < self.sequence_length:
-                raise ValueError(f"Insufficient data for {symbol}")
-            
-            # Get current price
-            current_price = self.preprocessor.get_latest_price(data)
+            lstm_model, preprocessor = self._serving_pair()
+            data, current_price, prediction_data = self._fetch_prediction_input(symbol, preprocessor)
             
-            # Prepare data for prediction
-            prediction_data = self.preprocessor.prepare_prediction_data(data)
+            # Hand the model a C-contiguous float32 buffer (no-op when already so)
+            prediction_data = np.ascontiguousarray(prediction_data, dtype=np.float32)
             
             # Make prediction
             print(f"Making prediction...")
-            prediction_scaled = self.lstm_model.predict(prediction_data)
+            with self._predict_lock:
+                prediction_scaled = lstm_model.predict(prediction_data)
             
             # Convert back to original scale
-            prediction = self.preprocessor.inverse_transform(prediction_scaled)[0, 0]
+            prediction = preprocessor.inverse_transform_target(prediction_scaled)
             
-            # Calculate confidence (simple approach - can be enhanced)
-            confidence = 0.85  # Placeholder confidence score
-            
-            # Calculate price change
-            price_change = ((prediction - current_price) / current_price) * 100
+            return self._prediction_results([symbol], [data], [current_price], prediction)[0]
             
+        except Exception as e:
             return {
+                'status': 'error',
+                'message': f'Prediction failed: {str(e)}'
+            }
+    
+    def _fetch_prediction_input(self, symbol: str,
+                                preprocessor: StockDataPreprocessor) -> Tuple[pd.DataFrame, float, np.ndarray]:
+        """
+        Fetch recent data for a symbol and prepare the model input
+        
+        Args:
+            symbol (str): Stock symbol to predict
+            preprocessor (StockDataPreprocessor): Scaler paired with the model that will predict
+        
+        Returns:
+            Tuple[pd.DataFrame, float, np.ndarray]: Recent data, current price and model input
+        """
+        print(f"Fetching latest data for {symbol}...")
+        # Only the last sequence_length rows feed the model
+        data = preprocessor.fetch_stock_data(symbol, "3mo", tail=self.sequence_length)
+        
+        if len(data) < self.sequence_length:
+            raise ValueError(f"Insufficient data for {symbol}")
+        
+        # Get current price
+        current_price = preprocessor.get_latest_price(data)
+        
+        # Prepare data for prediction
+        prediction_data = preprocessor.prepare_prediction_data(data)
+        
+        return data, current_price, prediction_data
+    
+    def _prediction_results(self, symbols: List[str], datas: List[pd.DataFrame],
+                            current_prices: np.ndarray, predictions: np.ndarray) -> List[Dict]:
+        """
+        Build result dictionaries for a batch of predictions
+        
+        Price changes and rounding are computed on whole arrays, and values are
+        returned as plain Python floats.
+        
+        Args:
+            symbols (List[str]): Stock symbols
+            datas (List[pd.DataFrame]): Recent data each prediction was made from
+            current_prices (np.ndarray): Latest closing prices
+            predictions (np.ndarray): Predicted prices in original scale
+        
+        Returns:
+            List[Dict]: Prediction results, one per symbol
+        """
+        current_prices = np.asarray(current_prices, dtype=np.float64)
+        predictions = np.asarray(predictions, dtype=np.float64)
+        
+        # Calculate confidence (simple approach - can be enhanced)
+        confidence = 0.85  # Placeholder confidence score
+        
+        # Calculate price change
+        price_changes = ((predictions - current_prices) / current_prices) * 100
+        
+        rounded = zip(np.round(current_prices, 2).tolist(),
+                      np.round(predictions, 2).tolist(),
+                      np.round(price_changes, 2).tolist())
+        
+        return [
+            {
                 'status': 'success',
                 'symbol': symbol,
-                'current_price': round(current_price, 2),
-                'predicted_price': round(prediction, 2),
-                'price_change': round(price_change, 2),
-                'confidence': round(confidence, 3),
-                'prediction_date': data['Date'].iloc[-1].strftime('%Y-%m-%d'),
+                'current_price': current_price,
+                'predicted_price': prediction,
+                'price_change': price_change,
+                'confidence': confidence,
+                'prediction_date': data['Date'].iat[-1].strftime('%Y-%m-%d'),
                 'message': f'Prediction completed for {symbol}'
             }
-            
-        except Exception as e:
+            for symbol, data, (current_price, prediction, price_change) in zip(symbols, datas, rounded)
+        ]
+    
+    def predict_many(self, symbols: List[str], days_ahead: int = 1) -> Dict[str, Dict]:
+        """
+        Predict prices for several symbols with a single batched forward pass
+        
+        Args:
+            symbols (List[str]): Stock symbols to predict
+            days_ahead (int): Number of days ahead to predict
+        
+        Returns:
+            Dict[str, Dict]: Prediction results keyed by symbol
+        """
+        if not self.is_trained:
             return {
-                'status': 'error',
-                'message': f'Prediction failed: {str(e)}'
+                symbol: {
+                    'status': 'error',
+                    'message': 'Model not trained. Please train the model first.'
+                }
+                for symbol in symbols
             }
+        
+        lstm_model, preprocessor = self._serving_pair()
+        results = {}
+        prepared = {}
+        
+        # Fetching is I/O bound, so overlap the per-symbol downloads
+        if symbols:
+            with ThreadPoolExecutor(max_workers=min(16, len(symbols))) as executor:
+                futures = {
+                    symbol: executor.submit(self._fetch_prediction_input, symbol, preprocessor)
+                    for symbol in symbols
+                }
+                for symbol, future in futures.items():
+                    try:
+                        prepared[symbol] = future.result()
+                    except Exception as e:
+                        results[symbol] = {
+                            'status': 'error',
+                            'message': f'Prediction failed: {str(e)}'
+                        }
+        
+        if prepared:
+            try:
+                # Stack the (1, sequence_length, features) inputs into one batch
+                batch = np.concatenate([inputs for _, _, inputs in prepared.values()], axis=0)
+                batch = np.ascontiguousarray(batch, dtype=np.float32)
+                
+                print(f"Making {len(batch)} predictions...")
+                with self._predict_lock:
+                    predictions_scaled = lstm_model.predict(batch)
+                
+                # Convert the whole batch back to original scale in one pass
+                predictions = preprocessor.inverse_transform_target(predictions_scaled)
+                
+                batch_results = self._prediction_results(
+                    list(prepared),
+                    [data for data, _, _ in prepared.values()],
+                    [current_price for _, current_price, _ in prepared.values()],
+                    predictions
+                )
+                results.update(zip(prepared, batch_results))
+                    
+            except Exception as e:
+                for symbol in prepared:
+                    results[symbol] = {
+                        'status': 'error',
+                        'message': f'Prediction failed: {str(e)}'
+                    }
+        
+        return {symbol: results[symbol] for symbol in symbols}
     
     def get_stock_info(self, symbol: str) -> Dict:
         """
@@ -175,22 +378,21 @@ class StockPredictor:
             Dict: Stock information
         """
         try:
-            data = self.preprocessor.fetch_stock_data(symbol, "1mo")
+            # Enough rows for the 30-day change
+            data = self.preprocessor.fetch_stock_data(symbol, "1mo", tail=31)
             
             current_price = self.preprocessor.get_latest_price(data)
-            price_change_1d = self.preprocessor.get_price_change(data, 1)
-            price_change_7d = self.preprocessor.get_price_change(data, 7)
-            price_change_30d = self.preprocessor.get_price_change(data, 30)
+            changes = self.preprocessor.get_price_changes(data, (1, 7, 30))
             
             return {
                 'status': 'success',
                 'symbol': symbol,
                 'current_price': round(current_price, 2),
-                'price_change_1d': round(price_change_1d, 2),
-                'price_change_7d': round(price_change_7d, 2),
-                'price_change_30d': round(price_change_30d, 2),
-                'volume': int(data['Volume'].iloc[-1]),
-                'last_updated': data['Date'].iloc[-1].strftime('%Y-%m-%d')
+                'price_change_1d': round(changes[1], 2),
+                'price_change_7d': round(changes[7], 2),
+                'price_change_30d': round(changes[30], 2),
+                'volume': int(data['Volume'].iat[-1]),
+                'last_updated': data['Date'].iat[-1].strftime('%Y-%m-%d')
             }
             
         except Exception as e:
@@ -210,12 +412,7 @@ class StockPredictor:
         Returns:
             Dict: Batch prediction results
         """
-        results = {}
-        
-        for symbol in symbols:
-            print(f"Processing {symbol}...")
-            result = self.predict_stock_price(symbol, days_ahead)
-            results[symbol] = result
+        results = self.predict_many(symbols, days_ahead)
         
         return {
             'status': 'success',
@@ -223,6 +420,14 @@ class StockPredictor:
             'total_symbols': len(symbols)
         }
     
+    def warmup(self):
+        """Run a dummy prediction so model loading and compilation happen up front"""
+        if not self.is_trained:
+            return
+        
+        dummy = np.zeros((1, self.sequence_length, self.lstm_model.features), dtype=np.float32)
+        self.lstm_model.predict(dummy)
+    
     def get_model_status(self) -> Dict:
         """
         Get current model status
@@ -1,10 +1,46 @@
 import cohere
-from typing import Dict, List, Optional
+import diskcache
+import hashlib
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
 import os
 from django.conf import settings
 import random
+import re
 import time
 
+try:
+    from cohere.errors import TooManyRequestsError
+    RATE_LIMIT_ERRORS = (TooManyRequestsError,)
+except ImportError:  # Older SDKs without typed errors
+    RATE_LIMIT_ERRORS = ()
+
+# Few-shot examples sent with every classify request
+SENTIMENT_EXAMPLES = [
+    ("Stock market reaches new all-time high", "bullish"),
+    ("Company reports record-breaking quarterly earnings", "bullish"),
+    ("Tech giant announces major breakthrough innovation", "bullish"),
+    ("Market crashes due to economic uncertainty", "bearish"),
+    ("Company files for bankruptcy", "bearish"),
+    ("Federal Reserve raises interest rates", "bearish"),
+    ("Company releases quarterly earnings report", "neutral"),
+    ("Market shows mixed signals", "neutral"),
+    ("Trading volume remains steady", "neutral"),
+]
+
+# Maximum number of texts Cohere accepts in one classify call
+CLASSIFY_BATCH_SIZE = 96
+
+# How long Cohere classifications are reused from the on-disk cache (seconds)
+SENTIMENT_CACHE_TTL = 86400
+
+# Keywords for the fallback analysis, matched at word starts so "surges" still counts
+BULLISH_KEYWORDS = ['bullish', 'rally', 'surge', 'jump', 'gain', 'rise', 'high', 'record', 'breakthrough', 'innovation']
+BEARISH_KEYWORDS = ['bearish', 'crash', 'decline', 'drop', 'fall', 'low', 'bankruptcy', 'uncertainty', 'concern', 'weak']
+_BULLISH_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, BULLISH_KEYWORDS)) + ')', re.IGNORECASE)
+_BEARISH_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, BEARISH_KEYWORDS)) + ')', re.IGNORECASE)
+
 
 class SentimentAnalyzer:
     """Class for analyzing financial news sentiment using Cohere API"""
@@ -13,9 +49,17 @@ class SentimentAnalyzer:
         """Initialize the sentiment analyzer"""
         self.api_key = getattr(settings, 'COHERE_API_KEY', None)
         self.co = None
+        # Classify request arguments, built once and reused for every call
+        self._model_name = 'large'
+        self._examples = []
+        
+        # Cohere results keyed by text hash, so repeated headlines skip the API
+        self._sent_cache = diskcache.Cache('.sentiment_cache')
         
         if self.api_key:
             try:
+                # Built here so an incompatible SDK falls back to the keyword analysis
+                self._examples = [cohere.Example(text, label) for text, label in SENTIMENT_EXAMPLES]
                 self.co = cohere.Client(self.api_key)
                 print("Cohere API client initialized successfully")
             except Exception as e:
@@ -37,36 +81,17 @@ class SentimentAnalyzer:
         if not self.co:
             return self._get_dummy_sentiment(text)
         
+        key = self._cache_key(text)
+        cached = self._sent_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
             # Use Cohere's classify endpoint for sentiment analysis
-            response = self.co.classify(
-                texts=[text],
-                model='large',
-                examples=[
-                    cohere.Example("Stock market reaches new all-time high", "bullish"),
-                    cohere.Example("Company reports record-breaking quarterly earnings", "bullish"),
-                    cohere.Example("Tech giant announces major breakthrough innovation", "bullish"),
-                    cohere.Example("Market crashes due to economic uncertainty", "bearish"),
-                    cohere.Example("Company files for bankruptcy", "bearish"),
-                    cohere.Example("Federal Reserve raises interest rates", "bearish"),
-                    cohere.Example("Company releases quarterly earnings report", "neutral"),
-                    cohere.Example("Market shows mixed signals", "neutral"),
-                    cohere.Example("Trading volume remains steady", "neutral")
-                ]
-            )
-            
-            # Extract results
-            classification = response.classifications[0]
-            predicted_label = classification.prediction
-            confidence = classification.confidence
-            
-            return {
-                'status': 'success',
-                'text': text,
-                'sentiment': predicted_label,
-                'confidence': round(confidence, 3),
-                'source': 'Cohere API'
-            }
+            response = self._classify([text])
+            result = self._classification_result(text, response.classifications[0])
+            self._sent_cache.set(key, result, expire=SENTIMENT_CACHE_TTL)
+            return result
             
         except Exception as e:
             print(f"Error analyzing sentiment with Cohere: {str(e)}")
@@ -82,17 +107,81 @@ class SentimentAnalyzer:
         Returns:
             List[Dict]: List of sentiment analysis results
         """
-        results = []
+        if not self.co:
+            return [self._get_dummy_sentiment(text) for text in texts]
         
-        for text in texts:
-            result = self.analyze_text_sentiment(text)
-            results.append(result)
-            
-            # Add small delay to avoid rate limiting
-            time.sleep(0.1)
+        keys = [self._cache_key(text) for text in texts]
+        results = [self._sent_cache.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        
+        # Only uncached texts go to Cohere, CLASSIFY_BATCH_SIZE per request
+        for start in range(0, len(misses), CLASSIFY_BATCH_SIZE):
+            batch = misses[start:start + CLASSIFY_BATCH_SIZE]
+            try:
+                response = self._classify([texts[i] for i in batch])
+                # A short response can't be matched back to its inputs, so treat it as a failure
+                if len(response.classifications) != len(batch):
+                    raise ValueError(f"Expected {len(batch)} classifications, got {len(response.classifications)}")
+                for i, classification in zip(batch, response.classifications):
+                    results[i] = self._classification_result(texts[i], classification)
+                    self._sent_cache.set(keys[i], results[i], expire=SENTIMENT_CACHE_TTL)
+            except Exception as e:
+                print(f"Error analyzing sentiment with Cohere: {str(e)}")
+                for i in batch:
+                    results[i] = self._get_dummy_sentiment(texts[i])
         
         return results
     
+    def _cache_key(self, text: str) -> str:
+        """
+        Build the sentiment cache key for a text
+        
+        Args:
+            text (str): Text to analyze
+        
+        Returns:
+            str: SHA1 hex digest of the text
+        """
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+    
+    def _classify(self, texts: List[str], max_retries: int = 3):
+        """
+        Send one classify request, backing off exponentially when rate limited
+        
+        Args:
+            texts (List[str]): Texts to classify
+            max_retries (int): Retries allowed after a rate-limit error
+        
+        Returns:
+            Cohere classify response
+        """
+        for attempt in range(max_retries + 1):
+            try:
+                return self.co.classify(texts=texts, model=self._model_name, examples=self._examples)
+            except RATE_LIMIT_ERRORS:
+                if attempt == max_retries:
+                    raise
+                time.sleep(0.5 * (2 ** attempt))
+    
+    def _classification_result(self, text: str, classification) -> Dict:
+        """
+        Convert a Cohere classification into a sentiment result
+        
+        Args:
+            text (str): Text that was classified
+            classification: Cohere classification for the text
+        
+        Returns:
+            Dict: Sentiment analysis results
+        """
+        return {
+            'status': 'success',
+            'text': text,
+            'sentiment': classification.prediction,
+            'confidence': round(classification.confidence, 3),
+            'source': 'Cohere API'
+        }
+    
     def analyze_financial_news(self, news_items: List[Dict]) -> Dict:
         """
         Analyze sentiment of financial news items
@@ -119,23 +208,13 @@ class SentimentAnalyzer:
         sentiment_results = self.analyze_batch_sentiment(all_texts)
         
         # Aggregate results
-        sentiment_counts = {'bullish': 0, 'bearish': 0, 'neutral': 0}
-        total_confidence = 0
-        valid_results = 0
-        
-        for result in sentiment_results:
-            if result['status'] == 'success':
-                sentiment_counts[result['sentiment']] += 1
-                total_confidence += result['confidence']
-                valid_results += 1
+        sentiment_counts, avg_confidence, valid_results = self._aggregate_sentiment(sentiment_results)
         
         # Calculate overall sentiment
         if valid_results > 0:
             overall_sentiment = max(sentiment_counts, key=sentiment_counts.get)
-            avg_confidence = total_confidence / valid_results
         else:
             overall_sentiment = 'neutral'
-            avg_confidence = 0.0
         
         return {
             'status': 'success',
@@ -199,14 +278,9 @@ class SentimentAnalyzer:
         Returns:
             Dict: Dummy sentiment analysis results
         """
-        # Simple keyword-based sentiment analysis
-        text_lower = text.lower()
-        
-        bullish_keywords = ['bullish', 'rally', 'surge', 'jump', 'gain', 'rise', 'high', 'record', 'breakthrough', 'innovation']
-        bearish_keywords = ['bearish', 'crash', 'decline', 'drop', 'fall', 'low', 'bankruptcy', 'uncertainty', 'concern', 'weak']
-        
-        bullish_score = sum(1 for keyword in bullish_keywords if keyword in text_lower)
-        bearish_score = sum(1 for keyword in bearish_keywords if keyword in text_lower)
+        # Simple keyword-based sentiment analysis, one regex pass per side
+        bullish_score = len(_BULLISH_RE.findall(text))
+        bearish_score = len(_BEARISH_RE.findall(text))
         
         if bullish_score > bearish_score:
             sentiment = 'bullish'
@@ -242,15 +316,7 @@ class SentimentAnalyzer:
                 'message': 'No sentiment results to summarize'
             }
         
-        sentiment_counts = {'bullish': 0, 'bearish': 0, 'neutral': 0}
-        total_confidence = 0
-        valid_results = 0
-        
-        for result in sentiment_results:
-            if result['status'] == 'success':
-                sentiment_counts[result['sentiment']] += 1
-                total_confidence += result['confidence']
-                valid_results += 1
+        sentiment_counts, avg_confidence, valid_results = self._aggregate_sentiment(sentiment_results)
         
         if valid_results == 0:
             return {
@@ -276,10 +342,30 @@ class SentimentAnalyzer:
             'sentiment_percentages': sentiment_percentages,
             'dominant_sentiment': dominant_sentiment,
             'dominant_percentage': dominant_percentage,
-            'average_confidence': round(total_confidence / valid_results, 3),
+            'average_confidence': round(avg_confidence, 3),
             'market_outlook': self._get_market_outlook(dominant_sentiment, dominant_percentage)
         }
     
+    def _aggregate_sentiment(self, sentiment_results: List[Dict]) -> Tuple[Dict[str, int], float, int]:
+        """
+        Count sentiments and average confidence over successful results
+        
+        Args:
+            sentiment_results (List[Dict]): List of sentiment analysis results
+        
+        Returns:
+            Tuple[Dict[str, int], float, int]: Sentiment counts, average confidence and number of valid results
+        """
+        valid = [result for result in sentiment_results if result['status'] == 'success']
+        
+        counts = Counter(result['sentiment'] for result in valid)
+        sentiment_counts = dict.fromkeys(['bullish', 'bearish', 'neutral'], 0) | counts
+        
+        confidences = np.fromiter((result['confidence'] for result in valid), dtype=np.float64, count=len(valid))
+        avg_confidence = float(confidences.mean()) if confidences.size else 0.0
+        
+        return sentiment_counts, avg_confidence, len(valid)
+    
     def _get_market_outlook(self, dominant_sentiment: str, percentage: float) -> str:
         """
         Generate market outlook based on sentiment analysis
@@ -0,0 +1,22 @@
+from celery import shared_task
+from typing import Dict
+from .predictor import get_predictor
+
+
+@shared_task
+def train_model_task(symbol: str, period: str = "2y", epochs: int = 50) -> Dict:
+    """
+    Train the LSTM model in a Celery worker
+    
+    Args:
+        symbol (str): Stock symbol to train on
+        period (str): Time period for training data
+        epochs (int): Number of training epochs
+    
+    Returns:
+        Dict: Training results and metrics
+    """
+    # Reuse the worker's predictor so unchanged data skips retraining;
+    # prefork workers run one task per process at a time
+    predictor = get_predictor()
+    return predictor.train_model(symbol, period, epochs=epochs)
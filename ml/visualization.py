@@ -1,28 +1,311 @@
-import matplotlib.pyplot as plt
+import matplotlib
+import matplotlib.style
+from matplotlib import font_manager
+from matplotlib.artist import setp
+from matplotlib.axis import Tick
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgb
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.ticker import MaxNLocator
 import numpy as np
 import pandas as pd
+from PIL import Image
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional
+import fnmatch
+from functools import lru_cache
+import hashlib
+from inspect import signature
+import io
+import itertools
+import logging
+import math
 import os
-from datetime import datetime, timedelta
+import threading
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
-# Set matplotlib backend to Agg for non-interactive environments
-plt.switch_backend('Agg')
+logger = logging.getLogger(__name__)
+
+# Figures are drawn on FigureCanvasAgg directly, so pyplot (and its global
+# figure manager) is never imported and no backend switch is needed
 
 # Set style
-plt.style.use('default')
+matplotlib.style.use('default')
+
+# Split long line paths so Agg doesn't rasterize them as one huge path
+matplotlib.rcParams['agg.path.chunksize'] = 10000
+
+# More points than this can't be told apart on a 12-inch plot
+MAX_PLOT_POINTS = 2000
+
+# Line plots show every marker up to MARKER_POINTS points, thin them out up to
+# MAX_MARKER_POINTS, and draw plain lines beyond that
+MARKER_POINTS = 60
+MAX_MARKER_POINTS = 1000
+
+# Shared fonts, resolved against the font cache once at import instead of per text
+TITLE_FONTS = {size: FontProperties(size=size, weight='bold') for size in (14, 16, 18)}
+LABEL_FONT = FontProperties(size=12)
+LEGEND_FONT = FontProperties(size=11)
+for _font in (LABEL_FONT, TITLE_FONTS[16]):
+    font_manager.findfont(_font)
+
+# Date axes show at most DATE_TICKS ticks, rotated so the dates don't overlap.
+# Matplotlib >= 3.10 can right-align rotated labels through tick_params itself
+DATE_TICKS = 8
+X_TICK_PARAMS = {'labelrotation': 45}
+if 'labelrotation_mode' in signature(Tick.__init__).parameters:
+    X_TICK_PARAMS['labelrotation_mode'] = 'xtick'
+
+# Actual-vs-predicted figures kept per thread, see plot_actual_vs_predicted
+LINE_FIGURE_CACHE_SIZE = 8
+
+# Subplot margins of a new figure, restored on reused ones before drawing
+DEFAULT_SUBPLOT_PARAMS = {
+    name: matplotlib.rcParams[f'figure.subplot.{name}']
+    for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+}
+
+# Number of rendered plots remembered by input signature
+SIGNATURE_CACHE_SIZE = 64
+
+# Seconds between background sweeps of old plot files
+CLEANUP_INTERVAL = 60 * 60
+
+# Fast PNG settings: plots are mostly flat color, so heavy deflate buys little
+PNG_COMPRESS_LEVEL = 3
+
+
+@lru_cache(maxsize=32)
+def _parse_dates(dates: tuple) -> pd.DatetimeIndex:
+    """
+    Parse 'YYYY-MM-DD' strings in one vectorized pass, memoized across calls
+    
+    Args:
+        dates (tuple): Date strings
+    
+    Returns:
+        pd.DatetimeIndex: Parsed dates (shared between callers, do not modify)
+    """
+    return pd.to_datetime(list(dates), format='%Y-%m-%d', cache=True)
+
+
+def _coerce_dates(dates):
+    """
+    Convert 'YYYY-MM-DD' strings to datetimes in one vectorized pass
+    
+    The same date list is plotted by every chart of a request, so parses are
+    memoized by _parse_dates; anything that is not a sequence of strings is
+    returned unchanged.
+    
+    Args:
+        dates: Date strings, datetimes or a datetime Series/Index
+    
+    Returns:
+        Dates usable as a matplotlib x axis
+    """
+    if isinstance(next(iter(dates), None), str):
+        return _parse_dates(tuple(dates))
+    return dates
+
+
+def _blend(color, background, alpha: float) -> tuple:
+    """
+    Blend a color onto a background color, as alpha compositing would
+    
+    Args:
+        color: Foreground color
+        background: Background color
+        alpha (float): Foreground opacity
+    
+    Returns:
+        tuple: Opaque RGB color
+    """
+    fg = np.array(to_rgb(color))
+    bg = np.array(to_rgb(background))
+    return tuple((alpha * fg + (1 - alpha) * bg).tolist())
+
+
+def _plot_signature(*parts) -> bytes:
+    """
+    Hash the inputs of a plot so identical requests can reuse its file
+    
+    Args:
+        *parts: Plot name, symbol, value sequences, dates or DataFrames
+    
+    Returns:
+        bytes: Digest identifying the plot
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            digest.update(part.encode())
+        elif isinstance(part, pd.DataFrame):
+            digest.update(pd.util.hash_pandas_object(part).to_numpy().tobytes())
+        else:
+            values = np.asarray(part)
+            if values.dtype == object:
+                digest.update('\0'.join(map(str, values)).encode())
+            else:
+                digest.update(values.tobytes())
+        digest.update(b'\x1f')
+    return digest.digest()
+
+
+def _marker_style(marker: str, n_points: int, size: int) -> Dict:
+    """
+    Line-plot marker kwargs that stay cheap to draw on long series
+    
+    Args:
+        marker (str): Matplotlib marker symbol
+        n_points (int): Number of points in the series
+        size (int): Marker size
+    
+    Returns:
+        Dict: Keyword arguments for ax.plot
+    """
+    if n_points > MAX_MARKER_POINTS:
+        return {}
+    return {'marker': marker, 'markersize': size, 'markevery': max(1, n_points // MARKER_POINTS)}
+
+
+def _downsample(dates, values, n_max: int = MAX_PLOT_POINTS, aggregate: bool = False):
+    """
+    Reduce a series to at most n_max points by stride decimation
+    
+    Args:
+        dates: X values (dates) of the series
+        values: Y values of the series
+        n_max (int): Maximum number of points to keep
+        aggregate (bool): Sum each bucket instead of sampling it (for volumes)
+    
+    Returns:
+        Tuple of the reduced dates and values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    step = -(-len(values) // n_max)
+    if step <= 1:
+        return dates, values
+    
+    starts = np.arange(0, len(values), step)
+    dates = pd.Index(dates)[starts]
+    
+    if aggregate:
+        return dates, np.add.reduceat(values, starts)
+    return dates, values[starts]
+
+
+def _encode_png(image: Image.Image) -> bytes:
+    """
+    Encode an image as PNG with fast compression settings
+    
+    Args:
+        image (Image.Image): Image to encode
+    
+    Returns:
+        bytes: PNG file contents
+    """
+    buf = io.BytesIO()
+    image.save(buf, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
+    return buf.getvalue()
+
+
+def _write_png(image: Image.Image, filepath: str):
+    """
+    Encode an image and write it to a PNG file (runs on the I/O pool)
+    
+    Args:
+        image (Image.Image): Image to write
+        filepath (str): Destination path
+    """
+    try:
+        png = _encode_png(image)
+        with open(filepath, 'wb') as f:
+            f.write(png)
+    except Exception:
+        # Runs on the I/O pool after the path was handed out, so log with the traceback
+        logger.exception("Error writing plot %s", filepath)
+        raise
+
+
+# Background cleanup timer per output directory, see StockVisualizer.schedule_cleanup
+_cleanup_timers: Dict[str, threading.Timer] = {}
+_cleanup_lock = threading.Lock()
+
+
+def _cleanup_old_plots(output_dir: str, max_age_hours: int = 24):
+    """
+    Remove plot files older than max_age_hours from a directory
+    
+    Args:
+        output_dir (str): Directory holding the plots
+        max_age_hours (int): Maximum age of plots to keep
+    """
+    try:
+        cutoff_time = time.time() - max_age_hours * 3600
+        
+        # scandir entries carry their stat result, so no extra syscall per file
+        with os.scandir(output_dir) as entries:
+            old_plots = [
+                entry.path for entry in entries
+                if fnmatch.fnmatch(entry.name, '*.png') and entry.stat().st_ctime < cutoff_time
+            ]
+        
+        for filepath in old_plots:
+            os.remove(filepath)
+        
+        if old_plots:
+            print(f"Removed {len(old_plots)} old plots from {output_dir}")
+    
+    except Exception as e:
+        print(f"Error cleaning up plots: {str(e)}")
+
+
+def _start_cleanup_timer(output_dir: str, interval: int, max_age_hours: int):
+    """
+    Start the next cleanup sweep for a directory (caller holds _cleanup_lock)
+    
+    Args:
+        output_dir (str): Absolute directory to clean
+        interval (int): Seconds until the sweep
+        max_age_hours (int): Maximum age of plots to keep
+    """
+    def _cleanup_worker():
+        _cleanup_old_plots(output_dir, max_age_hours)
+        with _cleanup_lock:
+            # Not rescheduled if stopped or replaced while this sweep ran
+            if _cleanup_timers.get(output_dir) is timer:
+                _start_cleanup_timer(output_dir, interval, max_age_hours)
+    
+    timer = threading.Timer(interval, _cleanup_worker)
+    timer.daemon = True
+    _cleanup_timers[output_dir] = timer
+    timer.start()
 
 
 class StockVisualizer:
     """Class for creating stock price visualizations"""
     
-    def __init__(self, output_dir: str = 'static/images'):
+    # PNG deflate releases the GIL, so encodes from every instance run in parallel here
+    _io_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix='plot-io')
+    
+    # Shared by every instance, since they may write into the same directory
+    _counter = itertools.count()
+    _stamp = (None, '')
+    
+    def __init__(self, output_dir: str = 'static/images',
+                 cleanup_interval: Optional[int] = None):
         """
         Initialize the visualizer
         
         Args:
             output_dir (str): Directory to save generated plots
+            cleanup_interval (Optional[int]): Seconds between background cleanups of
+                old plots in output_dir, e.g. CLEANUP_INTERVAL (None leaves them off)
         """
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
@@ -39,8 +322,30 @@ class StockVisualizer:
             'grid': '#e9ecef',
             'text': '#212529'
         }
+        
+        # Translucent colors pre-blended onto their (constant) backgrounds, so
+        # Agg draws opaque fills instead of alpha-compositing every pixel
+        background = self.colors['background']
+        self.blended_colors = {
+            'grid': _blend(self.colors['grid'], background, 0.3),
+            'bar': _blend(self.colors['actual'], background, 0.7),
+            'bar_edge': _blend('black', background, 0.7),
+            'metrics_box': _blend(background, 'white', 0.8),
+        }
+        
+        # Per-thread (figure, axes) reused across plot calls, see _get_figure,
+        # plus line figures updated in place, see plot_actual_vs_predicted
+        self._fig_cache = threading.local()
+        
+        # Rendered file per input signature (LRU), so repeated plots skip drawing
+        self._sig_cache = OrderedDict()
+        self._sig_lock = threading.Lock()
+        
+        # Old plots are removed off the request path, see schedule_cleanup
+        if cleanup_interval is not None:
+            self.schedule_cleanup(cleanup_interval)
     
-    def plot_actual_vs_predicted(self, actual_prices: List[float], 
+    def plot_actual_vs_predicted(self, actual_prices: List[float],
                                 predicted_prices: List[float],
                                 dates: List[str],
                                 symbol: str,
@@ -59,56 +364,47 @@ class StockVisualizer:
             str: Path to saved plot or plot data
         """
         try:
-            # Create figure and axis
-            fig, ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
-            
-            # Convert dates to datetime if they're strings
-            if isinstance(dates[0], str):
-                dates = [datetime.strptime(d, '%Y-%m-%d') for d in dates]
-            
-            # Plot actual vs predicted
-            ax.plot(dates, actual_prices, 
-                   color=self.colors['actual'], 
-                   linewidth=2, 
-                   label='Actual Price', 
-                   marker='o', 
-                   markersize=4)
-            
-            ax.plot(dates, predicted_prices, 
-                   color=self.colors['predicted'], 
-                   linewidth=2, 
-                   label='Predicted Price', 
-                   marker='s', 
-                   markersize=4)
-            
-            # Customize the plot
-            ax.set_title(f'{symbol} Stock Price: Actual vs Predicted', 
-                        fontsize=16, fontweight='bold', color=self.colors['text'])
-            ax.set_xlabel('Date', fontsize=12, color=self.colors['text'])
-            ax.set_ylabel('Price ($)', fontsize=12, color=self.colors['text'])
-            ax.legend(fontsize=11, framealpha=0.9)
-            
-            # Format x-axis dates
-            ax.xaxis.set_major_locator(plt.MaxNLocator(8))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-            
-            # Add grid
-            ax.grid(True, alpha=0.3, color=self.colors['grid'])
-            ax.set_facecolor(self.colors['background'])
+            # Identical inputs were already rendered to a file that still exists
+            if save_plot:
+                signature = _plot_signature('actual_vs_predicted', symbol, actual_prices, predicted_prices, dates)
+                cached = self._cached_plot(signature)
+                if cached is not None:
+                    return cached
+            
+            dates = _coerce_dates(dates)
+            
+            # A figure already drawn for this symbol only needs its line data replaced
+            key = ('actual_vs_predicted', symbol, tuple(self.figsize))
+            lines = getattr(self._fig_cache, 'lines', None)
+            if lines is None:
+                lines = self._fig_cache.lines = OrderedDict()
+            
+            if save_plot and key in lines:
+                fig, ax, line_actual, line_pred = lines[key]
+                lines.move_to_end(key)
+                self._update_lines(ax, ((line_actual, 'o', actual_prices),
+                                        (line_pred, 's', predicted_prices)), dates)
+            else:
+                # Create figure and axis (not shared with _get_figure, whose figures get cleared)
+                fig, (ax,) = self._get_figure('actual_vs_predicted', self.figsize,
+                                              lambda f: (f.subplots(),), reuse=False)
+                
+                line_actual, line_pred = self._draw_actual_vs_predicted(
+                    ax, dates, actual_prices, predicted_prices,
+                    f'{symbol} Stock Price: Actual vs Predicted')
+                
+                if save_plot:
+                    lines[key] = (fig, ax, line_actual, line_pred)
+                    while len(lines) > LINE_FIGURE_CACHE_SIZE:
+                        lines.popitem(last=False)
             
             # Tight layout
-            plt.tight_layout()
+            fig.tight_layout()
             
             if save_plot:
-                # Generate filename
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f'{symbol}_actual_vs_predicted_{timestamp}.png'
-                filepath = os.path.join(self.output_dir, filename)
+                filepath = self._output_path(symbol, 'actual_vs_predicted')
                 
-                # Save plot
-                plt.savefig(filepath, dpi=self.dpi, bbox_inches='tight', 
-                           facecolor='white', edgecolor='none')
-                plt.close()
+                self._save(fig, filepath, signature)
                 
                 return filepath
             else:
@@ -132,60 +428,26 @@ class StockVisualizer:
             str: Path to saved plot or plot data
         """
         try:
-            # Create figure and axis
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), dpi=self.dpi)
-            
-            # Convert dates if needed
-            if 'Date' in data.columns:
-                dates = data['Date']
-            else:
-                dates = data.index
-            
-            # Plot 1: Price chart
-            ax1.plot(dates, data['Close'], 
-                    color=self.colors['actual'], 
-                    linewidth=2, 
-                    label='Close Price')
-            
-            ax1.set_title(f'{symbol} Stock Price History', 
-                         fontsize=16, fontweight='bold', color=self.colors['text'])
-            ax1.set_ylabel('Price ($)', fontsize=12, color=self.colors['text'])
-            ax1.legend(fontsize=11)
-            ax1.grid(True, alpha=0.3, color=self.colors['grid'])
-            ax1.set_facecolor(self.colors['background'])
-            
-            # Plot 2: Volume chart
-            ax2.bar(dates, data['Volume'], 
-                   color=self.colors['actual'], 
-                   alpha=0.7, 
-                   label='Volume')
+            # Identical inputs were already rendered to a file that still exists
+            if save_plot:
+                signature = _plot_signature('price_history', symbol, data)
+                cached = self._cached_plot(signature)
+                if cached is not None:
+                    return cached
             
-            ax2.set_title(f'{symbol} Trading Volume', 
-                         fontsize=14, fontweight='bold', color=self.colors['text'])
-            ax2.set_xlabel('Date', fontsize=12, color=self.colors['text'])
-            ax2.set_ylabel('Volume', fontsize=12, color=self.colors['text'])
-            ax2.legend(fontsize=11)
-            ax2.grid(True, alpha=0.3, color=self.colors['grid'])
-            ax2.set_facecolor(self.colors['background'])
+            # Create figure and axis
+            fig, (ax1, ax2) = self._get_figure('price_history', (12, 10),
+                                               lambda f: tuple(f.subplots(2, 1)), reuse=save_plot)
             
-            # Format x-axis dates
-            for ax in [ax1, ax2]:
-                ax.xaxis.set_major_locator(plt.MaxNLocator(8))
-                plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+            self._draw_price_history(ax1, ax2, data, symbol)
             
             # Tight layout
-            plt.tight_layout()
+            fig.tight_layout()
             
             if save_plot:
-                # Generate filename
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f'{symbol}_price_history_{timestamp}.png'
-                filepath = os.path.join(self.output_dir, filename)
+                filepath = self._output_path(symbol, 'price_history')
                 
-                # Save plot
-                plt.savefig(filepath, dpi=self.dpi, bbox_inches='tight', 
-                           facecolor='white', edgecolor='none')
-                plt.close()
+                self._save(fig, filepath, signature)
                 
                 return filepath
             else:
@@ -195,7 +457,7 @@ class StockVisualizer:
             print(f"Error creating price history plot: {str(e)}")
             return None
     
-    def plot_prediction_confidence(self, predictions: List[float], 
+    def plot_prediction_confidence(self, predictions: List[float],
                                  confidence_scores: List[float],
                                  dates: List[str], symbol: str,
                                  save_plot: bool = True) -> str:
@@ -213,61 +475,26 @@ class StockVisualizer:
             str: Path to saved plot or plot data
         """
         try:
-            # Create figure and axis
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), dpi=self.dpi)
-            
-            # Convert dates if needed
-            if isinstance(dates[0], str):
-                dates = [datetime.strptime(d, '%Y-%m-%d') for d in dates]
-            
-            # Plot 1: Predictions
-            ax1.plot(dates, predictions, 
-                    color=self.colors['predicted'], 
-                    linewidth=2, 
-                    marker='o', 
-                    markersize=6,
-                    label='Predicted Price')
-            
-            ax1.set_title(f'{symbol} Price Predictions', 
-                         fontsize=16, fontweight='bold', color=self.colors['text'])
-            ax1.set_ylabel('Price ($)', fontsize=12, color=self.colors['text'])
-            ax1.legend(fontsize=11)
-            ax1.grid(True, alpha=0.3, color=self.colors['grid'])
-            ax1.set_facecolor(self.colors['background'])
-            
-            # Plot 2: Confidence scores
-            ax2.bar(dates, confidence_scores, 
-                   color=self.colors['actual'], 
-                   alpha=0.7,
-                   label='Confidence Score')
+            # Identical inputs were already rendered to a file that still exists
+            if save_plot:
+                signature = _plot_signature('prediction_confidence', symbol, predictions, confidence_scores, dates)
+                cached = self._cached_plot(signature)
+                if cached is not None:
+                    return cached
             
-            ax2.set_title(f'{symbol} Prediction Confidence', 
-                         fontsize=14, fontweight='bold', color=self.colors['text'])
-            ax2.set_xlabel('Date', fontsize=12, color=self.colors['text'])
-            ax2.set_ylabel('Confidence', fontsize=12, color=self.colors['text'])
-            ax2.set_ylim(0, 1)
-            ax2.legend(fontsize=11)
-            ax2.grid(True, alpha=0.3, color=self.colors['grid'])
-            ax2.set_facecolor(self.colors['background'])
+            # Create figure and axis
+            fig, (ax1, ax2) = self._get_figure('prediction_confidence', (12, 10),
+                                               lambda f: tuple(f.subplots(2, 1)), reuse=save_plot)
             
-            # Format x-axis dates
-            for ax in [ax1, ax2]:
-                ax.xaxis.set_major_locator(plt.MaxNLocator(8))
-                plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+            self._draw_confidence(ax1, ax2, _coerce_dates(dates), predictions, confidence_scores, symbol)
             
             # Tight layout
-            plt.tight_layout()
+            fig.tight_layout()
             
             if save_plot:
-                # Generate filename
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f'{symbol}_prediction_confidence_{timestamp}.png'
-                filepath = os.path.join(self.output_dir, filename)
+                filepath = self._output_path(symbol, 'prediction_confidence')
                 
-                # Save plot
-                plt.savefig(filepath, dpi=self.dpi, bbox_inches='tight', 
-                           facecolor='white', edgecolor='none')
-                plt.close()
+                self._save(fig, filepath, signature)
                 
                 return filepath
             else:
@@ -277,7 +504,7 @@ class StockVisualizer:
             print(f"Error creating confidence plot: {str(e)}")
             return None
     
-    def create_dashboard_plot(self, symbol: str, 
+    def create_dashboard_plot(self, symbol: str,
                             actual_prices: List[float],
                             predicted_prices: List[float],
                             dates: List[str],
@@ -296,71 +523,34 @@ class StockVisualizer:
             str: Path to saved plot or plot data
         """
         try:
-            # Create figure with subplots
-            fig = plt.figure(figsize=(16, 12), dpi=self.dpi)
-            
-            # Main price comparison plot
-            ax1 = plt.subplot(2, 2, (1, 2))
-            ax1.plot(dates, actual_prices, 
-                    color=self.colors['actual'], 
-                    linewidth=2, 
-                    label='Actual Price', 
-                    marker='o', 
-                    markersize=4)
-            ax1.plot(dates, predicted_prices, 
-                    color=self.colors['predicted'], 
-                    linewidth=2, 
-                    label='Predicted Price', 
-                    marker='s', 
-                    markersize=4)
-            ax1.set_title(f'{symbol} Stock Price Analysis', 
-                         fontsize=18, fontweight='bold', color=self.colors['text'])
-            ax1.set_ylabel('Price ($)', fontsize=12, color=self.colors['text'])
-            ax1.legend(fontsize=11)
-            ax1.grid(True, alpha=0.3, color=self.colors['grid'])
-            ax1.set_facecolor(self.colors['background'])
-            
-            # Error analysis
-            ax2 = plt.subplot(2, 2, 3)
-            errors = np.array(actual_prices) - np.array(predicted_prices)
-            ax2.hist(errors, bins=20, color=self.colors['actual'], alpha=0.7, edgecolor='black')
-            ax2.set_title('Prediction Error Distribution', fontsize=14, fontweight='bold', color=self.colors['text'])
-            ax2.set_xlabel('Prediction Error ($)', fontsize=12, color=self.colors['text'])
-            ax2.set_ylabel('Frequency', fontsize=12, color=self.colors['text'])
-            ax2.grid(True, alpha=0.3, color=self.colors['grid'])
-            ax2.set_facecolor(self.colors['background'])
+            # Identical inputs were already rendered to a file that still exists
+            if save_plot:
+                signature = _plot_signature('dashboard', symbol, actual_prices, predicted_prices, dates)
+                cached = self._cached_plot(signature)
+                if cached is not None:
+                    return cached
             
-            # Performance metrics
-            ax3 = plt.subplot(2, 2, 4)
-            mse = np.mean(errors**2)
-            rmse = np.sqrt(mse)
-            mae = np.mean(np.abs(errors))
-            mape = np.mean(np.abs(errors / np.array(actual_prices))) * 100
+            # Create figure with subplots
+            fig, (ax1, ax2, ax3) = self._get_figure('dashboard', (16, 12), lambda f: (
+                f.add_subplot(2, 2, (1, 2)), f.add_subplot(2, 2, 3), f.add_subplot(2, 2, 4)
+            ), reuse=save_plot)
             
-            metrics_text = f'MSE: ${mse:.2f}\nRMSE: ${rmse:.2f}\nMAE: ${mae:.2f}\nMAPE: {mape:.2f}%'
-            ax3.text(0.1, 0.5, metrics_text, transform=ax3.transAxes, 
-                    fontsize=12, verticalalignment='center',
-                    bbox=dict(boxstyle='round', facecolor=self.colors['background'], alpha=0.8))
-            ax3.set_title('Model Performance Metrics', fontsize=14, fontweight='bold', color=self.colors['text'])
-            ax3.axis('off')
+            # Convert the price series once; plots and metrics share these arrays
+            actual = np.asarray(actual_prices, dtype=np.float64)
+            predicted = np.asarray(predicted_prices, dtype=np.float64)
             
-            # Format x-axis dates for main plot
-            ax1.xaxis.set_major_locator(plt.MaxNLocator(8))
-            plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right')
+            self._draw_actual_vs_predicted(ax1, _coerce_dates(dates), actual, predicted,
+                                           f'{symbol} Stock Price Analysis',
+                                           title_size=18, xlabel=False)
+            self._draw_error_analysis(ax2, ax3, actual, predicted)
             
             # Tight layout
-            plt.tight_layout()
+            fig.tight_layout()
             
             if save_plot:
-                # Generate filename
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f'{symbol}_dashboard_{timestamp}.png'
-                filepath = os.path.join(self.output_dir, filename)
+                filepath = self._output_path(symbol, 'dashboard')
                 
-                # Save plot
-                plt.savefig(filepath, dpi=self.dpi, bbox_inches='tight', 
-                           facecolor='white', edgecolor='none')
-                plt.close()
+                self._save(fig, filepath, signature)
                 
                 return filepath
             else:
@@ -370,25 +560,459 @@ class StockVisualizer:
             print(f"Error creating dashboard plot: {str(e)}")
             return None
     
-    def cleanup_old_plots(self, max_age_hours: int = 24):
+    def render_report(self, symbol: str,
+                      actual_prices: List[float],
+                      predicted_prices: List[float],
+                      dates: List[str],
+                      data: pd.DataFrame,
+                      confidence_scores: Optional[List[float]] = None,
+                      save_plot: bool = True) -> str:
         """
-        Clean up old plot files
+        Render the dashboard, price history and confidence plots as one figure
+        
+        Everything is laid out on a single figure, so the full report costs
+        one canvas draw and one PNG encode instead of four.
         
         Args:
-            max_age_hours (int): Maximum age of plots to keep
+            symbol (str): Stock symbol
+            actual_prices (List[float]): Actual prices
+            predicted_prices (List[float]): Predicted prices
+            dates (List[str]): Dates of the actual/predicted prices
+            data (pd.DataFrame): Stock data with OHLC columns
+            confidence_scores (Optional[List[float]]): Confidence per prediction (row omitted if None)
+            save_plot (bool): Whether to save the plot
+        
+        Returns:
+            str: Path to saved plot or plot data
         """
         try:
-            current_time = datetime.now()
-            cutoff_time = current_time - timedelta(hours=max_age_hours)
+            # Identical inputs were already rendered to a file that still exists
+            if save_plot:
+                signature = _plot_signature('report', symbol, actual_prices, predicted_prices, dates, data,
+                                            confidence_scores if confidence_scores is not None else ())
+                cached = self._cached_plot(signature)
+                if cached is not None:
+                    return cached
+            
+            rows = 3 if confidence_scores is None else 4
+            
+            # Row 1: actual vs predicted; then price/volume, [predictions/confidence,] errors/metrics
+            fig, axes = self._get_figure(f'report_{rows}', (16, 6 * rows), lambda f: (
+                f.add_subplot(rows, 2, (1, 2)),
+                *(f.add_subplot(rows, 2, i) for i in range(3, 2 * rows + 1))
+            ), reuse=save_plot)
+            
+            dates = _coerce_dates(dates)
+            actual = np.asarray(actual_prices, dtype=np.float64)
+            predicted = np.asarray(predicted_prices, dtype=np.float64)
+            
+            self._draw_actual_vs_predicted(axes[0], dates, actual, predicted,
+                                           f'{symbol} Stock Price Analysis', title_size=18)
+            self._draw_price_history(axes[1], axes[2], data, symbol)
+            if confidence_scores is not None:
+                self._draw_confidence(axes[3], axes[4], dates, predicted, confidence_scores, symbol)
+            self._draw_error_analysis(axes[-2], axes[-1], actual, predicted)
             
-            for filename in os.listdir(self.output_dir):
-                if filename.endswith('.png'):
-                    filepath = os.path.join(self.output_dir, filename)
-                    file_time = datetime.fromtimestamp(os.path.getctime(filepath))
-                    
-                    if file_time < cutoff_time:
-                        os.remove(filepath)
-                        print(f"Removed old plot: {filename}")
+            # Tight layout
+            fig.tight_layout()
+            
+            if save_plot:
+                filepath = self._output_path(symbol, 'report')
+                
+                self._save(fig, filepath, signature)
+                
+                return filepath
+            else:
+                return fig
         
         except Exception as e:
-            print(f"Error cleaning up plots: {str(e)}")
+            print(f"Error creating report plot: {str(e)}")
+            return None
+    
+    def _style_axes(self, ax):
+        """Apply the shared grid and background style to an axes"""
+        # The grid color is blended for the background, so keep it below the data
+        ax.set_axisbelow(True)
+        ax.grid(True, color=self.blended_colors['grid'])
+        ax.set_facecolor(self.colors['background'])
+    
+    def _format_date_axis(self, ax):
+        """Limit and rotate the date tick labels on an axes"""
+        # Locators bind to a single axis, so each axes needs its own instance
+        ax.xaxis.set_major_locator(MaxNLocator(DATE_TICKS))
+        ax.tick_params(axis='x', **X_TICK_PARAMS)
+        if 'labelrotation_mode' not in X_TICK_PARAMS:
+            setp(ax.xaxis.get_majorticklabels(), ha='right')
+    
+    def _draw_actual_vs_predicted(self, ax, dates, actual_prices, predicted_prices,
+                                  title: str, title_size: int = 16, xlabel: bool = True):
+        """
+        Draw actual and predicted price lines on one axes
+        
+        Args:
+            ax: Axes to draw on
+            dates: Parsed dates
+            actual_prices: Actual prices
+            predicted_prices: Predicted prices
+            title (str): Axes title
+            title_size (int): Title font size (a TITLE_FONTS key)
+            xlabel (bool): Whether to label the date axis
+        
+        Returns:
+            Tuple of the actual and predicted Line2D artists
+        """
+        line_actual, = ax.plot(dates, actual_prices,
+               color=self.colors['actual'],
+               linewidth=2,
+               label='Actual Price',
+               rasterized=True,
+               **_marker_style('o', len(dates), 4))
+        
+        line_pred, = ax.plot(dates, predicted_prices,
+               color=self.colors['predicted'],
+               linewidth=2,
+               label='Predicted Price',
+               rasterized=True,
+               **_marker_style('s', len(dates), 4))
+        
+        ax.set_title(title, fontproperties=TITLE_FONTS[title_size], color=self.colors['text'])
+        if xlabel:
+            ax.set_xlabel('Date', fontproperties=LABEL_FONT, color=self.colors['text'])
+        ax.set_ylabel('Price ($)', fontproperties=LABEL_FONT, color=self.colors['text'])
+        ax.legend(prop=LEGEND_FONT, framealpha=0.9)
+        
+        self._format_date_axis(ax)
+        self._style_axes(ax)
+        
+        return line_actual, line_pred
+    
+    def _update_lines(self, ax, series, dates):
+        """
+        Replace the data of existing line artists and rescale their axes
+        
+        Titles, labels, legend and styling are kept as drawn, so only the
+        lines and ticks change on the next canvas draw.
+        
+        Args:
+            ax: Axes holding the lines
+            series: (Line2D, marker, values) per line
+            dates: Parsed dates shared by all lines
+        """
+        for line, marker, values in series:
+            line.set_data(dates, values)
+            line.set(**(_marker_style(marker, len(dates), 4) or {'marker': 'None'}))
+        
+        ax.relim()
+        ax.autoscale_view()
+    
+    def _draw_price_history(self, ax_price, ax_volume, data: pd.DataFrame, symbol: str):
+        """
+        Draw close price and trading volume history
+        
+        Args:
+            ax_price: Axes for the close price line
+            ax_volume: Axes for the volume bars
+            data (pd.DataFrame): Stock data with OHLC columns
+            symbol (str): Stock symbol
+        """
+        # Convert dates if needed
+        if 'Date' in data.columns:
+            dates = _coerce_dates(data['Date'])
+        else:
+            dates = _coerce_dates(data.index)
+        
+        # Long histories are decimated; volumes are summed per bucket
+        close_dates, closes = _downsample(dates, data['Close'])
+        volume_dates, volumes = _downsample(dates, data['Volume'], aggregate=True)
+        
+        # Price chart
+        ax_price.plot(close_dates, closes,
+                      color=self.colors['actual'],
+                      linewidth=2,
+                      label='Close Price',
+                      rasterized=True)
+        
+        ax_price.set_title(f'{symbol} Stock Price History',
+                           fontproperties=TITLE_FONTS[16], color=self.colors['text'])
+        ax_price.set_ylabel('Price ($)', fontproperties=LABEL_FONT, color=self.colors['text'])
+        ax_price.legend(prop=LEGEND_FONT)
+        
+        # Volume chart
+        self._draw_bars(ax_volume, volume_dates, volumes, label='Volume')
+        
+        ax_volume.set_title(f'{symbol} Trading Volume',
+                            fontproperties=TITLE_FONTS[14], color=self.colors['text'])
+        ax_volume.set_xlabel('Date', fontproperties=LABEL_FONT, color=self.colors['text'])
+        ax_volume.set_ylabel('Volume', fontproperties=LABEL_FONT, color=self.colors['text'])
+        ax_volume.legend(prop=LEGEND_FONT)
+        
+        for ax in [ax_price, ax_volume]:
+            self._format_date_axis(ax)
+            self._style_axes(ax)
+    
+    def _draw_confidence(self, ax_pred, ax_conf, dates, predictions, confidence_scores, symbol: str):
+        """
+        Draw predicted prices and their confidence scores
+        
+        Args:
+            ax_pred: Axes for the prediction line
+            ax_conf: Axes for the confidence bars
+            dates: Parsed dates
+            predictions: Predicted prices
+            confidence_scores: Confidence score per prediction
+            symbol (str): Stock symbol
+        """
+        # Predictions
+        ax_pred.plot(dates, predictions,
+                     color=self.colors['predicted'],
+                     linewidth=2,
+                     label='Predicted Price',
+                     rasterized=True,
+                     **_marker_style('o', len(dates), 6))
+        
+        ax_pred.set_title(f'{symbol} Price Predictions',
+                          fontproperties=TITLE_FONTS[16], color=self.colors['text'])
+        ax_pred.set_ylabel('Price ($)', fontproperties=LABEL_FONT, color=self.colors['text'])
+        ax_pred.legend(prop=LEGEND_FONT)
+        
+        # Confidence scores
+        self._draw_bars(ax_conf, dates, confidence_scores, label='Confidence Score')
+        
+        ax_conf.set_title(f'{symbol} Prediction Confidence',
+                          fontproperties=TITLE_FONTS[14], color=self.colors['text'])
+        ax_conf.set_xlabel('Date', fontproperties=LABEL_FONT, color=self.colors['text'])
+        ax_conf.set_ylabel('Confidence', fontproperties=LABEL_FONT, color=self.colors['text'])
+        ax_conf.set_ylim(0, 1)
+        ax_conf.legend(prop=LEGEND_FONT)
+        
+        for ax in [ax_pred, ax_conf]:
+            self._format_date_axis(ax)
+            self._style_axes(ax)
+    
+    def _draw_error_analysis(self, ax_hist, ax_metrics, actual: np.ndarray, predicted: np.ndarray):
+        """
+        Draw the prediction error histogram and the performance metrics box
+        
+        Args:
+            ax_hist: Axes for the error histogram
+            ax_metrics: Axes for the metrics text
+            actual (np.ndarray): Actual prices
+            predicted (np.ndarray): Predicted prices
+        """
+        errors = actual - predicted
+        abs_errors = np.abs(errors)
+        
+        # Error analysis
+        ax_hist.hist(errors, bins=20, color=self.blended_colors['bar'],
+                     edgecolor=self.blended_colors['bar_edge'],
+                     rasterized=True)
+        ax_hist.set_title('Prediction Error Distribution', fontproperties=TITLE_FONTS[14], color=self.colors['text'])
+        ax_hist.set_xlabel('Prediction Error ($)', fontproperties=LABEL_FONT, color=self.colors['text'])
+        ax_hist.set_ylabel('Frequency', fontproperties=LABEL_FONT, color=self.colors['text'])
+        self._style_axes(ax_hist)
+        
+        # Performance metrics
+        mse = np.dot(errors, errors) / len(errors)
+        rmse = math.sqrt(mse)
+        mae = abs_errors.mean()
+        mape = (abs_errors / actual).mean() * 100
+        
+        metrics_text = f'MSE: ${mse:.2f}\nRMSE: ${rmse:.2f}\nMAE: ${mae:.2f}\nMAPE: {mape:.2f}%'
+        ax_metrics.text(0.1, 0.5, metrics_text, transform=ax_metrics.transAxes,
+                        fontproperties=LABEL_FONT, verticalalignment='center',
+                        bbox=dict(boxstyle='round', facecolor=self.blended_colors['metrics_box']))
+        ax_metrics.set_title('Model Performance Metrics', fontproperties=TITLE_FONTS[14], color=self.colors['text'])
+        ax_metrics.axis('off')
+    
+    def _draw_bars(self, ax, dates, values, label: str):
+        """
+        Draw a bar-style series as one LineCollection instead of a patch per bar
+        
+        Args:
+            ax: Axes to draw on
+            dates: X positions of the bars
+            values: Bar heights
+            label (str): Legend label
+        """
+        # Line width (in points) that fills ~80% of each bar slot, like ax.bar did.
+        # Measured on the subplot's grid position (reset by _get_figure) rather than
+        # ax.bbox, which may hold a previous tight_layout geometry
+        width = ax.get_subplotspec().get_position(ax.figure).width * ax.figure.get_figwidth() * 72
+        slot = width / max(len(values), 1)
+        ax.vlines(dates, 0, np.asarray(values, dtype=np.float64),
+                  colors=self.blended_colors['bar'],
+                  linewidth=max(1.0, 0.8 * slot), label=label, rasterized=True)
+    
+    def _cached_plot(self, signature: bytes) -> Optional[str]:
+        """
+        Look up the file previously rendered for a plot signature
+        
+        Args:
+            signature (bytes): Digest from _plot_signature
+        
+        Returns:
+            Optional[str]: Path of the existing plot, or None if it must be rendered
+        """
+        with self._sig_lock:
+            filepath = self._sig_cache.get(signature)
+            if filepath is None:
+                return None
+            
+            # Files may have been removed by cleanup_old_plots
+            if not os.path.exists(filepath):
+                del self._sig_cache[signature]
+                return None
+            
+            self._sig_cache.move_to_end(signature)
+            return filepath
+    
+    def _remember_plot(self, signature: bytes, filepath: str):
+        """
+        Record the file rendered for a plot signature, evicting the oldest entries
+        
+        Args:
+            signature (bytes): Digest from _plot_signature
+            filepath (str): Path of the rendered plot
+        """
+        with self._sig_lock:
+            self._sig_cache[signature] = filepath
+            self._sig_cache.move_to_end(signature)
+            while len(self._sig_cache) > SIGNATURE_CACHE_SIZE:
+                self._sig_cache.popitem(last=False)
+    
+    def _get_figure(self, name: str, figsize: tuple, layout, reuse: bool = True):
+        """
+        Get a cleared figure and its axes, reusing this thread's previous one
+        
+        Figures are built directly on an Agg canvas (no pyplot figure manager)
+        and kept per thread, since matplotlib figures are not thread-safe.
+        
+        Args:
+            name (str): Plot type the figure is used for
+            figsize (tuple): Figure size in inches
+            layout: Callable creating the axes on a new figure, returning a tuple
+            reuse (bool): Use the cache; figures handed to callers must be fresh
+        
+        Returns:
+            Tuple of the figure and its axes
+        """
+        key = (name, figsize)
+        cache = getattr(self._fig_cache, 'figures', None)
+        if cache is None:
+            cache = self._fig_cache.figures = {}
+        
+        if reuse and key in cache:
+            fig, axes = cache[key]
+            for ax in axes:
+                ax.clear()
+            # Undo the last tight_layout so the figure starts from a fresh one's geometry
+            fig.subplots_adjust(**DEFAULT_SUBPLOT_PARAMS)
+            return fig, axes
+        
+        fig = Figure(figsize=figsize, dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        axes = layout(fig)
+        
+        if reuse:
+            cache[key] = (fig, axes)
+        return fig, axes
+    
+    def _output_path(self, symbol: str, kind: str) -> str:
+        """
+        Build a unique, time-ordered path for a new plot file
+        
+        Args:
+            symbol (str): Stock symbol
+            kind (str): Plot type used in the filename
+        
+        Returns:
+            str: Path inside output_dir
+        """
+        # The timestamp prefix keeps files sorted by time; the counter keeps
+        # plots saved within the same second from overwriting each other
+        now = int(time.time())
+        stamp = StockVisualizer._stamp
+        if stamp[0] != now:
+            stamp = StockVisualizer._stamp = (now, time.strftime('%Y%m%d_%H%M%S', time.localtime(now)))
+        
+        filename = f'{symbol}_{kind}_{stamp[1]}_{next(self._counter):08x}.png'
+        return os.path.join(self.output_dir, filename)
+    
+    def _render_image(self, fig) -> Image.Image:
+        """
+        Draw a figure and copy its Agg canvas buffer into an image
+        
+        The single copy detaches the pixels from the canvas, so the (reused)
+        figure can be redrawn while the image is still being encoded.
+        
+        Args:
+            fig: Matplotlib figure to render
+        
+        Returns:
+            Image.Image: RGBA image of the figure
+        """
+        fig.canvas.draw()
+        rgba = fig.canvas.buffer_rgba()
+        height, width = rgba.shape[:2]
+        return Image.frombuffer('RGBA', (width, height), rgba, 'raw', 'RGBA', 0, 1).copy()
+    
+    def _save(self, fig, filepath: str, signature: Optional[bytes] = None) -> Future:
+        """
+        Render a figure and write it to PNG in the background
+        
+        Drawing stays on the calling thread (figures are not thread-safe);
+        only the deflate and file write run on the shared I/O pool.
+        
+        Args:
+            fig: Matplotlib figure to save
+            filepath (str): Destination path
+            signature (Optional[bytes]): Input signature to remember the file under once written
+        
+        Returns:
+            Future: Completes once the file is written
+        """
+        fig.set_facecolor('white')
+        image = self._render_image(fig)
+        future = self._io_pool.submit(_write_png, image, filepath)
+        
+        if signature is not None:
+            def _written(done: Future):
+                if done.exception() is None:
+                    self._remember_plot(signature, filepath)
+            future.add_done_callback(_written)
+        
+        return future
+    
+    def schedule_cleanup(self, interval: int = CLEANUP_INTERVAL, max_age_hours: int = 24):
+        """
+        Run cleanup_old_plots periodically on a background daemon thread
+        
+        The timer is kept per output directory at module level and holds no
+        reference to the visualizer, so instances can still be collected.
+        
+        Args:
+            interval (int): Seconds between cleanups
+            max_age_hours (int): Maximum age of plots to keep
+        """
+        output_dir = os.path.abspath(self.output_dir)
+        with _cleanup_lock:
+            timer = _cleanup_timers.pop(output_dir, None)
+            if timer is not None:
+                timer.cancel()
+            _start_cleanup_timer(output_dir, interval, max_age_hours)
+    
+    def stop_cleanup(self):
+        """Cancel the background cleanup started by schedule_cleanup"""
+        with _cleanup_lock:
+            timer = _cleanup_timers.pop(os.path.abspath(self.output_dir), None)
+            if timer is not None:
+                timer.cancel()
+    
+    def cleanup_old_plots(self, max_age_hours: int = 24):
+        """
+        Clean up old plot files
+        
+        Args:
+            max_age_hours (int): Maximum age of plots to keep
+        """
+        _cleanup_old_plots(self.output_dir, max_age_hours)
@@ -0,0 +1,20 @@
+"""
+Celery config for stock_prediction project.
+
+For more information on this file, see
+https://docs.celeryq.dev/en/stable/django/first-steps-with-django.html
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stock_prediction.settings')
+
+app = Celery('stock_prediction')
+
+# Read CELERY_* settings from Django settings
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# ml is a plain package rather than an installed app, so list it explicitly
+app.autodiscover_tasks(['ml'])
@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stock_prediction.settings')
+# Load and warm the predictor in web-server processes, see CoreConfig.ready
+os.environ.setdefault('PREDICTOR_WARMUP', '1')
 
 application = get_wsgi_application()